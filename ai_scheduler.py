@@ -0,0 +1,39 @@
+import time
+from settings import *
+
+class AIScheduler:
+    def __init__(self, budget_ms=ai_budget_ms):
+        # Time allowed per frame for enemy decisions, in seconds.
+        self.budget = budget_ms / 1000
+        # Position in the round-robin over non-urgent enemies.
+        self.cursor = 0
+        # Decisions made during the last frame (urgent, round-robin), for profiling.
+        self.last_counts = (0, 0)
+
+    def run(self, enemies, target_for):
+        # Runs AI decisions for this frame within the budget. Urgent enemies always decide;
+        # the rest take turns in round-robin order until the budget is spent, with at least
+        # one per frame so nobody starves.
+        start = time.perf_counter()
+        waiting = []
+        urgent = 0
+        for enemy in enemies:
+            target = target_for(enemy)
+            if enemy.is_urgent(target):
+                enemy.think(target)
+                urgent += 1
+            else:
+                waiting.append((enemy, target))
+
+        decided = 0
+        if waiting:
+            count = len(waiting)
+            self.cursor %= count
+            while decided < count:
+                if decided and time.perf_counter() - start >= self.budget:
+                    break
+                enemy, target = waiting[(self.cursor + decided) % count]
+                enemy.think(target)
+                decided += 1
+            self.cursor = (self.cursor + decided) % count
+        self.last_counts = (urgent, decided)
@@ -0,0 +1,40 @@
+from settings import *
+from support import import_folder, get_mask
+
+# Animation states.
+idle, move, attack = range(3)
+state_names = ('idle', 'move', 'attack')
+
+# Facing directions, plus the unit vector each one points along.
+up, down, left, right = range(4)
+direction_names = ('up', 'down', 'left', 'right')
+direction_vectors = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Next state from (attacking, moving): attacking wins, then moving, otherwise idle.
+transitions = ((idle, move), (attack, attack))
+
+# Status names by [state][direction], as used for folder names and on the network
+# (e.g. 'down_idle', 'left', 'up_attack').
+player_status_names = (
+    tuple(f'{name}_idle' for name in direction_names),
+    direction_names,
+    tuple(f'{name}_attack' for name in direction_names))
+# Enemies have one animation per state, whatever way they face.
+enemy_status_names = tuple((name,) * len(direction_names) for name in state_names)
+
+def load_frame_table(base_path, status_names):
+    # Loads the frames of every (state, direction) pair into nested tuples indexed as
+    # table[state][direction]. Pairs that share a folder share one tuple of frames.
+    # Their collision masks are built here too, since players and enemies are hit-tested.
+    folders = {}
+    table = []
+    for names in status_names:
+        row = []
+        for name in names:
+            if name not in folders:
+                folders[name] = tuple(import_folder(base_path + name))
+                for frame in folders[name]:
+                    get_mask(frame)
+            row.append(folders[name])
+        table.append(tuple(row))
+    return tuple(table)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import pygame
+from settings import *
+
+# File layout: magic, version, index length, JSON index, padding, then raw RGBA pixel buffers.
+# The index maps each path to [offset, width, height, source size, source content hash].
+bundle_magic = b'TGAB'
+bundle_version = 3
+header_format = '<4sII'
+# Pixel buffers start on this alignment so they can be used straight from the mapping.
+buffer_alignment = 16
+
+def normalize_path(path):
+    # Index keys use forward slashes and no redundant separators, whatever the platform.
+    return os.path.normpath(path).replace(os.sep, '/')
+
+def file_hash(path):
+    # Content hash of a source file; unlike an mtime it survives checkouts and 'touch',
+    # so rebuilding from the same files gives the same bundle bytes.
+    with open(path, 'rb') as source_file:
+        return hashlib.blake2b(source_file.read(), digest_size=16).hexdigest()
+
+def png_names(folder):
+    # Sorted PNG file names directly inside a folder (None if it does not exist).
+    try:
+        return sorted(name for name in os.listdir(folder) if name.lower().endswith('.png'))
+    except OSError:
+        return None
+
+def collect_images(roots):
+    # Lists every PNG under the given roots in sorted order, so bundles are reproducible.
+    paths = []
+    for root in roots:
+        for folder, folders, files in os.walk(root):
+            folders.sort()
+            for name in sorted(files):
+                if name.lower().endswith('.png'):
+                    paths.append(normalize_path(os.path.join(folder, name)))
+    return sorted(paths)
+
+def build_bundle(output=asset_bundle_path, roots=asset_bundle_roots):
+    # Decodes every image once and packs the raw RGBA pixels with an index into one file.
+    index = {}
+    buffers = []
+    offset = 0
+    for path in collect_images(roots):
+        image = pygame.image.load(path)
+        pixels = pygame.image.tobytes(image, 'RGBA')
+        padding = -len(pixels) % buffer_alignment
+        index[path] = [offset, image.get_width(), image.get_height(), os.path.getsize(path), file_hash(path)]
+        buffers.append(pixels + bytes(padding))
+        offset += len(pixels) + padding
+
+    index_bytes = json.dumps(index, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    header = struct.pack(header_format, bundle_magic, bundle_version, len(index_bytes))
+    data_start = len(header) + len(index_bytes)
+    data_start += -data_start % buffer_alignment
+
+    with open(output, 'wb') as bundle_file:
+        bundle_file.write(header)
+        bundle_file.write(index_bytes)
+        bundle_file.write(bytes(data_start - len(header) - len(index_bytes)))
+        for pixels in buffers:
+            bundle_file.write(pixels)
+    return len(index), data_start + offset
+
+class AssetBundle:
+    def __init__(self, path):
+        # Maps the whole bundle read-only; pages are only touched when an image is built.
+        with open(path, 'rb') as bundle_file:
+            self.data = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_length = struct.unpack_from(header_format, self.data)
+        if magic != bundle_magic or version != bundle_version:
+            raise ValueError(f'{path} is not a version {bundle_version} asset bundle')
+        header_size = struct.calcsize(header_format)
+        self.index = json.loads(self.data[header_size:header_size + index_length])
+        self.data_start = header_size + index_length
+        self.data_start += -self.data_start % buffer_alignment
+
+        # Entries whose PNG was edited or removed after the bundle was built. They no longer
+        # count as bundled, so edited images are loaded from disk and removed ones are not
+        # served at all. The size is compared first; only same-size files are hashed.
+        self.stale = set()
+        for asset_path, (offset, image_width, image_height, size, content_hash) in self.index.items():
+            try:
+                if os.path.getsize(asset_path) != size or file_hash(asset_path) != content_hash:
+                    self.stale.add(asset_path)
+            except OSError:
+                self.stale.add(asset_path)
+
+        # Groups the (already sorted) paths by folder for import_folder. Folders whose PNGs were
+        # added or removed since the build are left out, so they are listed from disk instead.
+        self.folders = {}
+        for asset_path in sorted(self.index):
+            self.folders.setdefault(asset_path.rsplit('/', 1)[0], []).append(asset_path)
+        changed_folders = [folder for folder, asset_paths in self.folders.items()
+                           if png_names(folder) != [asset_path.rsplit('/', 1)[1] for asset_path in asset_paths]]
+        for folder in changed_folders:
+            del self.folders[folder]
+
+        if self.stale or changed_folders:
+            print(f'{path}: {len(self.stale)} images and {len(changed_folders)} folders changed since the bundle '
+                  f"was built; reading them from disk (rebuild with 'python bundle.py')")
+
+    def __contains__(self, path):
+        # Only up-to-date images count as bundled.
+        path = normalize_path(path)
+        return path in self.index and path not in self.stale
+
+    def folder(self, path):
+        # Returns the sorted image paths directly inside a folder, or None if it is not bundled.
+        return self.folders.get(normalize_path(path))
+
+    def load(self, path):
+        # Wraps the mapped pixels in a Surface without copying or PNG decoding.
+        offset, image_width, image_height = self.index[normalize_path(path)][:3]
+        start = self.data_start + offset
+        pixels = memoryview(self.data)[start:start + image_width * image_height * 4]
+        return pygame.image.frombuffer(pixels, (image_width, image_height), 'RGBA')
+
+if __name__ == '__main__':
+    # Builds the bundle: python bundle.py [output path]
+    output = sys.argv[1] if len(sys.argv) > 1 else asset_bundle_path
+    count, size = build_bundle(output)
+    print(f'Packed {count} images into {output} ({size / 1048576:.1f} MB)')
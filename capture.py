@@ -0,0 +1,114 @@
+import json
+import os
+import queue
+import threading
+import time
+import pygame
+from settings import *
+
+class FrameRecorder:
+    def __init__(self, surface, output=capture_path, frame_format=capture_format, buffers=capture_buffers, workers=capture_workers):
+        # Remembers the pixel layout of the surface being recorded.
+        self.size = surface.get_size()
+        self.pitch = surface.get_pitch()
+        self.bitsize = surface.get_bitsize()
+        self.masks = surface.get_masks()
+        self.frame_format = frame_format
+        self.output = output
+        os.makedirs(output, exist_ok=True)
+
+        # Ring of preallocated pixel buffers; 'free' and 'ready' pass buffer indices around.
+        self.buffers = [memoryview(bytearray(self.pitch * self.size[1])) for _ in range(buffers)]
+        self.free = queue.Queue()
+        for index in range(buffers):
+            self.free.put(index)
+        self.ready = queue.Queue()
+
+        # Statistics, reported on close.
+        self.frame_number = 0
+        self.captured = 0
+        self.dropped = 0
+        self.capture_time = 0.0
+
+        # A raw stream must be written in order, so it gets a single writer.
+        if frame_format == 'raw':
+            workers = 1
+            self.stream = open(os.path.join(output, 'capture.raw'), 'wb')
+            self.write_stream_info()
+        else:
+            self.stream = None
+        self.workers = [threading.Thread(target=self.work, name=f'capture-{i}', daemon=True) for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def write_stream_info(self):
+        # Describes the raw stream so it can be encoded later (e.g. ffmpeg -f rawvideo).
+        info = {
+            'width': self.size[0],
+            'height': self.size[1],
+            'pitch': self.pitch,
+            'bitsize': self.bitsize,
+            'masks': self.masks,
+            'fps': fps,
+        }
+        with open(os.path.join(self.output, 'capture.json'), 'w') as info_file:
+            json.dump(info, info_file, indent=2)
+
+    def capture(self, surface):
+        # Copies the frame into a free buffer on the calling thread; encoding happens on the workers.
+        # When every buffer is still waiting to be written, the frame is dropped instead of stalling.
+        start = time.perf_counter()
+        self.frame_number += 1
+        try:
+            index = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        # A raw byte view of the surface is copied with a single memcpy.
+        self.buffers[index][:] = surface.get_view('0')
+        self.ready.put((index, self.frame_number))
+        self.captured += 1
+        self.capture_time += time.perf_counter() - start
+        return True
+
+    def work(self):
+        while True:
+            item = self.ready.get()
+            if item is None:
+                return
+            index, frame_number = item
+            try:
+                if self.stream:
+                    self.stream.write(self.buffers[index])
+                else:
+                    self.save_png(self.buffers[index], frame_number)
+            finally:
+                # Hands the buffer back to the ring.
+                self.free.put(index)
+
+    def save_png(self, pixels, frame_number):
+        # Rebuilds a Surface with the captured layout and writes it as a numbered PNG.
+        frame = pygame.Surface(self.size, 0, self.bitsize, self.masks)
+        if frame.get_pitch() == self.pitch:
+            frame.get_buffer().write(pixels.tobytes())
+        else:
+            row_bytes = self.size[0] * frame.get_bytesize()
+            frame_buffer = frame.get_buffer()
+            for row in range(self.size[1]):
+                start = row * self.pitch
+                frame_buffer.write(pixels[start:start + row_bytes].tobytes(), row * frame.get_pitch())
+        pygame.image.save(frame, os.path.join(self.output, f'frame_{frame_number:06d}.png'))
+
+    def close(self):
+        # Waits for queued frames to be written, then stops the workers.
+        for _ in self.workers:
+            self.ready.put(None)
+        for worker in self.workers:
+            worker.join()
+        if self.stream:
+            self.stream.close()
+
+    def report(self):
+        average = self.capture_time / self.captured * 1000 if self.captured else 0.0
+        return (f'capture: {self.captured} frames written to {self.output}, '
+                f'{self.dropped} dropped, {average:.3f} ms per frame on the game thread')
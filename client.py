@@ -0,0 +1,88 @@
+import random
+import selectors
+import socket
+import threading
+import time
+from settings import *
+from protocol import *
+
+class GameClient:
+    def __init__(self, address):
+        # Connects to a game server and waits for its hello message.
+        self.sock = socket.create_connection(address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.receive_buffer = b''
+        # Replicated entities: entity ID -> {'kind', 'x', 'y', 'status', 'health'}.
+        self.world = {}
+        self.server_tick = 0
+        self.snapshots = 0
+        self.bytes_received = 0
+        self.input_tick = 0
+        self.entity_id = None
+        while self.entity_id is None:
+            self.receive()
+
+    def send_input(self, held, pressed=()):
+        # Sends the actions held now and the ones pressed since the last input message.
+        self.input_tick += 1
+        payload = input_format.pack(self.input_tick, encode_actions(held), encode_actions(pressed))
+        self.sock.sendall(frame_message(message_input, payload))
+
+    def receive(self):
+        # Reads whatever has arrived and applies it; returns False once the server hangs up.
+        data = self.sock.recv(65536)
+        if not data:
+            return False
+        self.bytes_received += len(data)
+        messages, self.receive_buffer = read_messages(self.receive_buffer + data)
+        for message_type, payload in messages:
+            if message_type == message_hello:
+                self.entity_id, self.tick_rate = hello_format.unpack(payload)
+            elif message_type == message_snapshot:
+                self.server_tick = apply_snapshot(self.world, payload)
+                self.snapshots += 1
+        return True
+
+    def close(self):
+        self.sock.close()
+
+class BotThread(threading.Thread):
+    def __init__(self, address, seconds, seed=0):
+        # Headless client that wanders, attacks and casts at random for a fixed time.
+        super().__init__(name=f'bot-{seed}', daemon=True)
+        self.address = address
+        self.client = None
+        self.seconds = seconds
+        self.random = random.Random(seed)
+
+    def run(self):
+        # Connects from the bot thread, since the server only answers once it is ticking.
+        self.client = GameClient(self.address)
+        selector = selectors.DefaultSelector()
+        selector.register(self.client.sock, selectors.EVENT_READ)
+        interval = 1 / self.client.tick_rate
+        end = time.perf_counter() + self.seconds
+        held = set()
+        while time.perf_counter() < end:
+            if self.random.random() < 0.05:
+                held = {self.random.choice(('up', 'down', 'left', 'right'))}
+                if self.random.random() < 0.5:
+                    held.add('attack')
+            pressed = {'magic'} if self.random.random() < 0.01 else set()
+            try:
+                self.client.send_input(held, pressed)
+                deadline = time.perf_counter() + interval
+                while (remaining := deadline - time.perf_counter()) > 0:
+                    if selector.select(remaining) and not self.client.receive():
+                        return
+            except OSError:
+                return
+        selector.close()
+        self.client.close()
+
+def run_bots(address, count, seconds):
+    # Connects and starts a number of bot clients against a server.
+    bots = [BotThread(address, seconds, seed) for seed in range(count)]
+    for bot in bots:
+        bot.start()
+    return bots
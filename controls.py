@@ -0,0 +1,68 @@
+import pygame
+from settings import *
+
+class InputState:
+    def __init__(self, bindings=None):
+        # Maps key codes to the action they trigger, using key_bindings from settings by default.
+        self.bindings = {}
+        for action, key_names in (bindings or key_bindings).items():
+            for key_name in key_names:
+                self.bindings[pygame.key.key_code(key_name)] = action
+
+        # Keys currently down for each action, so two keys bound to one action release correctly.
+        self.held_keys = {}
+        # Actions that went down / up since the start of the current tick.
+        self.pressed = set()
+        self.released = set()
+
+    def begin_tick(self):
+        # Clears the per-tick edges; call once before processing the tick's events.
+        self.pressed.clear()
+        self.released.clear()
+
+    def process_event(self, event):
+        # Turns KEYDOWN/KEYUP events into action state changes.
+        if event.type == pygame.KEYDOWN:
+            action = self.bindings.get(event.key)
+            if action is not None:
+                self.press(action, event.key)
+        elif event.type == pygame.KEYUP:
+            action = self.bindings.get(event.key)
+            if action is not None:
+                self.release(action, event.key)
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # Key-up events are not delivered while unfocused, so nothing stays held.
+            for action in list(self.held_keys):
+                self.release(action)
+
+    def press(self, action, key=None):
+        # Marks an action as down; also used to inject input in headless runs.
+        keys = self.held_keys.setdefault(action, set())
+        if not keys:
+            self.pressed.add(action)
+        keys.add(key)
+
+    def release(self, action, key=None):
+        # Marks an action as up once none of its keys are held (key=None releases all of them).
+        keys = self.held_keys.get(action)
+        if not keys:
+            return
+        if key is None:
+            keys.clear()
+        else:
+            keys.discard(key)
+        if not keys:
+            del self.held_keys[action]
+            self.released.add(action)
+
+    def is_held(self, action):
+        # True while the action is down, including the tick it was pressed.
+        return action in self.held_keys
+
+    def was_pressed(self, action):
+        # True only on the tick the action went down.
+        return action in self.pressed
+
+    def was_released(self, action):
+        # True only on the tick the action went up.
+        return action in self.released
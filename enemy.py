@@ -1,24 +1,63 @@
 import pygame
 from settings import *
 from entity import Entity
-from support import import_folder
+from animation import *
+from startup_trace import trace_stage
 
 class Enemy(Entity):
-    def __init__(self, monster_name, pos, groups, obstacle_sprites, add_exp):
+    # Frame tables shared by every enemy of the same type, keyed by monster name.
+    animation_cache = {}
+    # Enemies have no directional art; every state is drawn facing down.
+    facing = down
+
+    def __init__(self, monster_name, pos, groups, obstacle_sprites, add_exp, line_of_sight=None):
         # Initialize the base Entity class and register with sprite groups.
         super().__init__(*groups)
         self.sprite_type = 'enemy'
 
         # Load graphics specific to the monster name.
         self.import_graphics(monster_name)
-        self.status = 'idle'
+        self.obstacle_sprites = obstacle_sprites
+
+        # Load specific stats from the monster_data dictionary in settings.py.
+        self.monster_name = monster_name 
+        monster_info = monster_data[self.monster_name] 
+        self.exp = monster_info['exp']
+        self.speed = monster_info['speed']
+        self.attack_damage = monster_info['damage']
+        self.attack_radius = monster_info['attack_radius']
+        self.notice_radius = monster_info['notice_radius']
+        self.attack_type = monster_info['attack_type']
+        
+        # Action timing, overriding the default cooldown if specified in monster data.
+        self.attack_cooldown = monster_info.get('attack_cooldown', 1000)
+        self.invincibility_duration = 300
+        self.hit_stun_duration = 300
+        
+        # Reference to the function for adding experience to the player.
+        self.add_exp = add_exp
+
+        # Grid line-of-sight service; ranged enemies only attack what they can see.
+        self.line_of_sight = line_of_sight
+
+        # Called with this enemy after it dies, so a pool can reuse it.
+        self.on_release = None
+
+        # Sets all per-life state (position, health, timers).
+        self.reset(pos)
+
+    def reset(self, pos):
+        # Restores the enemy to a freshly spawned state at the given position.
+        self.state = idle
+        self.frame_index = 0
+        self.direction = pygame.math.Vector2()
 
         # Set the initial image based on the first frame of the idle animation.
-        if self.animations.get(self.status) and len(self.animations[self.status]) > 0:
-            self.image = self.animations[self.status][int(self.frame_index)]
+        if self.frames[idle][self.facing]:
+            self.image = self.frames[idle][self.facing][0]
         else:
             # Fallback placeholder (red square) if graphics are missing.
-            self.image = pygame.Surface((64, 64), flags=pygame.SRCALPHA)
+            self.image = pygame.Surface((64, 64)).convert()
             self.image.fill((120, 20, 20))
 
         # Setup the rectangle and hitbox for the enemy.
@@ -26,48 +65,30 @@ class Enemy(Entity):
         self.hitbox = self.rect.inflate(0, -10)
         # Position vector for smooth movement calculations.
         self.pos = pygame.math.Vector2(self.rect.topleft)
-        self.obstacle_sprites = obstacle_sprites
 
         # Action state variables.
         self.attacking = False
         self.can_attack = True
         self.attack_time = None
-        self.attack_cooldown = 1000
-
-        # Load specific stats from the monster_data dictionary in settings.py.
-        self.monster_name = monster_name 
-        monster_info = monster_data[self.monster_name] 
-        self.health = monster_info['health']
-        self.exp = monster_info['exp']
-        self.speed = monster_info['speed']
-        self.attack_damage = monster_info['damage']
-        self.attack_radius = monster_info['attack_radius']
-        self.notice_radius = monster_info['notice_radius']
-        self.attack_type = monster_info['attack_type']
-        
-        # Override default cooldown if specified in monster data.
-        if 'attack_cooldown' in monster_info:
-            self.attack_cooldown = monster_info['attack_cooldown']
+        self.health = monster_data[self.monster_name]['health']
 
         # Logic for taking damage and invincibility frames.
         self.vulnerable = True
         self.hit_time = None
-        self.invincibility_duration = 300
         
         # Logic for hit stun (knockback state).
         self.hit_stun = False
-        self.hit_stun_duration = 300
-        
-        # Reference to the function for adding experience to the player.
-        self.add_exp = add_exp
+
+        # The player who hit this enemy most recently.
+        self.last_attacker = None
     
     def actions(self):
         # Prevent the enemy from starting an attack if they are currently stunned.
         if self.hit_stun:
             return
 
-        # Determines if the enemy should attack based on status and cooldown.
-        if self.status == 'attack' and self.can_attack and not self.attacking:
+        # Determines if the enemy should attack based on state and cooldown.
+        if self.state == attack and self.can_attack and not self.attacking:
             print('attack')
             self.can_attack = False
             self.attack_time = pygame.time.get_ticks()
@@ -83,6 +104,9 @@ class Enemy(Entity):
                 magic_damage = player.stats['magic'] + magic_data[player.magic]['strength']
                 self.health -= magic_damage
             
+            # Remembers who hit last, so the kill's EXP goes to them.
+            self.last_attacker = player
+
             # Record the hit time and make the enemy temporarily invulnerable.
             self.hit_time = pygame.time.get_ticks()
             self.vulnerable = False
@@ -94,8 +118,10 @@ class Enemy(Entity):
     def check_death(self):
         # Checks if health is zero or less, grants EXP, and removes the sprite.
         if self.health <= 0:
-            self.add_exp(self.exp)
+            self.add_exp(self.exp, self.last_attacker)
             self.kill()
+            if self.on_release:
+                self.on_release(self)
 
     def cooldowns(self):
         # Manages various timers.
@@ -118,23 +144,27 @@ class Enemy(Entity):
                 self.hit_stun = False
 
     def import_graphics(self, name):
-        # Loads animation frames for idle, move, and attack states.
-        self.animations = {'idle': [], 'move': [], 'attack': []}
-        main_path = f'graphics/monsters/{name}/'
-        for animation in self.animations.keys():
-            full_path = main_path + animation
-            self.animations[animation] = import_folder(main_path + animation)
+        # Loads the idle, move and attack frames into a frame table once per monster type.
+        if name not in Enemy.animation_cache:
+            with trace_stage(f'import_graphics {name}'):
+                Enemy.animation_cache[name] = load_frame_table(f'graphics/monsters/{name}/', enemy_status_names)
+        self.frames = Enemy.animation_cache[name]
+
+    @property
+    def status(self):
+        # Status name of the current state ('idle', 'move' or 'attack'), for replication.
+        return state_names[self.state]
 
     def animate(self):
         # Handles sprite animation cycling.
-        animation = self.animations[self.status]
+        animation = self.frames[self.state][self.facing]
         if not animation:
             return
             
         self.frame_index += self.animation_speed
         if self.frame_index >= len(animation):
             # If an attack animation finishes, stop the attacking state.
-            if self.status == 'attack':
+            if self.state == attack:
                 self.attacking = False
             self.frame_index = 0
             
@@ -155,53 +185,68 @@ class Enemy(Entity):
 
         return (distance, direction)
 
+    def can_see(self, player):
+        # Melee enemies need no line of sight; ranged ones need a clear line to the player.
+        if self.attack_type != 'ranged' or self.line_of_sight is None:
+            return True
+        return self.line_of_sight.is_clear(self.hitbox.center, player.hitbox.center)
+
     def get_status(self, player):
         # Determines the enemy's state based on distance to player.
         distance = self.get_player_distance_direction(player)[0]
 
         # If already attacking, stay in attack state until animation ends.
         if self.attacking:
-            self.status = 'attack'
+            self.state = attack
             return
 
+        # Ranged enemies neither notice nor attack a player behind a wall; the (cached) ray is
+        # only cast when the player is close enough to matter.
+        if distance <= self.notice_radius and not self.can_see(player):
+            self.state = idle
         # Check if close enough to attack and cooldown is ready.
-        if distance <= self.attack_radius and self.can_attack:
-            if self.status != 'attack':
+        elif distance <= self.attack_radius and self.can_attack:
+            if self.state != attack:
                 self.frame_index = 0
-            self.status = 'attack'
+            self.state = attack
         # Check if close enough to notice the player and chase.
         elif distance <= self.notice_radius:
-            self.status = 'move'
+            self.state = move
         # Otherwise, stay idle.
         else:
-            self.status = 'idle'
+            self.state = idle
 
-    def update(self):
-        # Standard update method called by sprite groups.
-        self.animate()
+    def movement(self):
+        # Advances timers and moves along the direction chosen by the last AI decision.
         self.cooldowns()
-        self.check_death()
         
-        # If in hit stun, we allow movement (knockback) regardless of status.
-        # Otherwise, only move if status is 'move'.
+        # If in hit stun, we allow movement (knockback) regardless of state.
+        # Otherwise, only move in the move state.
         if self.hit_stun:
             self.move(self.speed)
-        elif self.status == 'move':
+        elif self.state == move:
             self.move(self.speed)
 
-    def enemy_update(self, player):
-        # AI logic update called specifically by the level class.
+    def think(self, player):
+        # AI decision: picks the state, starts attacks and sets the movement direction.
+        # Between decisions the enemy keeps moving on the last chosen direction.
         self.get_status(player)
         self.actions()
         
         if self.hit_stun:
             # If stunned, set direction AWAY from the player (knockback).
             self.direction = -(self.get_player_distance_direction(player)[1])
-        elif self.status == 'move':
+        elif self.state == move:
             # If chasing, set direction TOWARD the player.
             self.direction = self.get_player_distance_direction(player)[1]
         else:
             # Otherwise stop moving.
             self.direction = pygame.math.Vector2()
-            
-        self.update()
\ No newline at end of file
+
+    def is_urgent(self, player):
+        # True when a decision cannot wait: just hit, mid-attack, or the player is within attack range.
+        if self.hit_stun or self.attacking:
+            return True
+        dx = player.rect.centerx - self.rect.centerx
+        dy = player.rect.centery - self.rect.centery
+        return dx * dx + dy * dy <= self.attack_radius * self.attack_radius
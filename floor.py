@@ -0,0 +1,115 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+from support import import_csv_layout, load_image, image_source, is_bundled, register_surface
+
+# The pre-rendered ground image used by the 'image' floor source.
+ground_path = 'graphics/tilemap/ground.png'
+
+class Floor:
+    def __init__(self):
+        # Stores how the floor is built ('image' or 'csv').
+        self.source = floor_source
+        self.chunk_size = floor_chunk_size
+
+        # Cached floor chunks keyed by (chunk column, chunk row), in least-recently-used order.
+        self.chunks = OrderedDict()
+
+        if self.source == 'csv':
+            # Builds chunks lazily from the floor layout and the tileset.
+            self.layout = import_csv_layout('map/map_Floor.csv')
+            self.tileset = load_image('graphics/tilemap/Floor.png')
+            self.tileset_columns = self.tileset.get_width() // tile_size
+            map_width = max(len(row) for row in self.layout) * tile_size
+            map_height = len(self.layout) * tile_size
+            self.size = (map_width, map_height)
+            # Only the chunks around the camera are kept, so memory scales with the visible area.
+            self.cache_limit = floor_chunk_cache_size
+        elif is_bundled(ground_path):
+            # Cuts chunks lazily out of a view of the bundle's mapped pixels, so only the chunks
+            # in the cache take display-format memory and evicted ones are cut again when needed.
+            self.ground = image_source(ground_path)
+            self.size = self.ground.get_size()
+            self.cache_limit = floor_chunk_cache_size
+        else:
+            # Without the bundle the decoded PNG would have to stay resident as the chunk source,
+            # so every chunk is cut once and the original is dropped; memory is one copy of the image.
+            ground = image_source(ground_path)
+            self.size = ground.get_size()
+            for chunk_key in self.all_chunk_keys():
+                chunk = ground.subsurface(self.chunk_rect(chunk_key)).convert()
+                register_surface(chunk, ground_path)
+                self.chunks[chunk_key] = chunk
+            self.cache_limit = None
+
+        self.rect = pygame.Rect((0, 0), self.size)
+
+    def all_chunk_keys(self):
+        # Lists every chunk coordinate covering the floor.
+        columns = -(-self.size[0] // self.chunk_size)
+        rows = -(-self.size[1] // self.chunk_size)
+        return [(col, row) for row in range(rows) for col in range(columns)]
+
+    def chunk_rect(self, chunk_key):
+        # Returns the world rectangle covered by a chunk, clipped to the floor edges.
+        col, row = chunk_key
+        rect = pygame.Rect(col * self.chunk_size, row * self.chunk_size, self.chunk_size, self.chunk_size)
+        return rect.clip(pygame.Rect((0, 0), self.size))
+
+    def build_chunk(self, chunk_key):
+        # Renders one chunk from the floor layout, using water for empty cells,
+        # or converts its part of the ground image.
+        rect = self.chunk_rect(chunk_key)
+        if self.source != 'csv':
+            chunk = self.ground.subsurface(rect).convert()
+            register_surface(chunk, ground_path)
+            return chunk
+        chunk = pygame.Surface(rect.size).convert()
+        chunk.fill(water_color)
+
+        first_col = rect.left // tile_size
+        first_row = rect.top // tile_size
+        for row_index in range(first_row, -(-rect.bottom // tile_size)):
+            row = self.layout[row_index]
+            for col_index in range(first_col, min(len(row), -(-rect.right // tile_size))):
+                tile_id = int(row[col_index])
+                if tile_id < 0:
+                    continue
+                area = pygame.Rect(
+                    (tile_id % self.tileset_columns) * tile_size,
+                    (tile_id // self.tileset_columns) * tile_size,
+                    tile_size,
+                    tile_size)
+                chunk.blit(self.tileset, (col_index * tile_size - rect.left, row_index * tile_size - rect.top), area)
+        register_surface(chunk, 'map/map_Floor.csv')
+        return chunk
+
+    def get_chunk(self, chunk_key):
+        # Returns a cached chunk, building it (and evicting the oldest) when needed.
+        chunk = self.chunks.get(chunk_key)
+        if chunk is None:
+            chunk = self.build_chunk(chunk_key)
+            self.chunks[chunk_key] = chunk
+            if self.cache_limit is not None and len(self.chunks) > self.cache_limit:
+                self.chunks.popitem(last=False)
+        elif self.cache_limit is not None:
+            self.chunks.move_to_end(chunk_key)
+        return chunk
+
+    def visible_chunks(self, view_rect):
+        # Yields (chunk, world position) for every chunk intersecting the camera view.
+        view_rect = view_rect.clip(self.rect)
+        if not view_rect.width or not view_rect.height:
+            return
+        first_col = view_rect.left // self.chunk_size
+        last_col = (view_rect.right - 1) // self.chunk_size
+        first_row = view_rect.top // self.chunk_size
+        last_row = (view_rect.bottom - 1) // self.chunk_size
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                yield self.get_chunk((col, row)), (col * self.chunk_size, row * self.chunk_size)
+
+    def draw(self, surface, offset):
+        # Blits only the chunks that intersect the camera, clipped to the display.
+        view_rect = pygame.Rect((int(offset.x), int(offset.y)), surface.get_size())
+        surface.blits([(chunk, (x - offset.x, y - offset.y)) for chunk, (x, y) in self.visible_chunks(view_rect)], False)
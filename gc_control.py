@@ -0,0 +1,84 @@
+import gc
+import time
+from settings import *
+
+class GCController:
+    def __init__(self):
+        # Pause statistics per generation: collections, total seconds and longest pause,
+        # plus how many automatic pauses landed inside frame work instead of the collections run here.
+        self.collections = [0, 0, 0]
+        self.pause_total = [0.0, 0.0, 0.0]
+        self.pause_max = [0.0, 0.0, 0.0]
+        self.in_work = 0
+        self.in_work_total = 0.0
+        self.controlled = False
+        self.started = None
+        gc.callbacks.append(self.on_gc)
+
+        # Automatic collections are switched off; they run between frames instead.
+        if gc_slack_collection:
+            gc.disable()
+
+    def on_gc(self, phase, info):
+        # Times every collection, whoever triggered it.
+        if phase == 'start':
+            self.started = time.perf_counter()
+        elif self.started is not None:
+            pause = time.perf_counter() - self.started
+            self.started = None
+            generation = info['generation']
+            self.collections[generation] += 1
+            self.pause_total[generation] += pause
+            self.pause_max[generation] = max(self.pause_max[generation], pause)
+            if not self.controlled:
+                self.in_work += 1
+                self.in_work_total += pause
+
+    def level_loaded(self):
+        # Moves everything alive after a level load (tiles, rects, surfaces, the previous level's
+        # leftovers aside) into the permanent generation, so later collections stop rescanning it.
+        gc.unfreeze()
+        self.collect(2)
+        if gc_freeze_after_load:
+            gc.freeze()
+
+    def collect(self, generation):
+        self.controlled = True
+        try:
+            gc.collect(generation)
+        finally:
+            self.controlled = False
+
+    def slack(self, remaining_ms):
+        # Runs the collections that are due while the frame has time to spare. If garbage piles up
+        # far past the thresholds (frames keep overrunning), it is collected anyway.
+        if not gc_slack_collection:
+            return
+        counts = gc.get_count()
+        thresholds = gc.get_threshold()
+        force = remaining_ms < gc_min_slack_ms
+        for generation in (2, 1, 0):
+            limit = thresholds[generation] * (gc_force_factor if force else 1)
+            if counts[generation] >= limit:
+                self.collect(generation)
+                return
+
+    def report(self):
+        lines = ['gc: ' + ', '.join(
+            f'gen{generation} {self.collections[generation]} collections, '
+            f'avg {self.pause_total[generation] / max(1, self.collections[generation]) * 1000:.3f} ms, '
+            f'max {self.pause_max[generation] * 1000:.3f} ms'
+            for generation in range(3))]
+        lines.append(f'  {gc.get_freeze_count()} objects frozen, {self.in_work} pauses inside frame work '
+                     f'({self.in_work_total * 1000:.1f} ms in total)')
+        return lines
+
+    def close(self):
+        # Hands the collector back in its normal state: automatic collections on and nothing
+        # frozen. Safe to call more than once, and re-enables collection even if unhooking fails.
+        try:
+            if self.on_gc in gc.callbacks:
+                gc.callbacks.remove(self.on_gc)
+        finally:
+            gc.unfreeze()
+            gc.enable()
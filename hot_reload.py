@@ -0,0 +1,99 @@
+import os
+import time
+import pygame
+from settings import *
+from support import import_csv_layout, reload_image, stale_bundle_paths, stale_bundle_folders
+from floor import Floor
+from player import Player
+from enemy import Enemy
+from weapon import Weapon
+
+# Folders whose images are watched.
+watched_folders = ('graphics', 'images')
+# Files the floor is built from; any change rebuilds the floor.
+floor_files = ('map/map_Floor.csv', 'graphics/tilemap/Floor.png', 'graphics/tilemap/ground.png')
+
+def clear_asset_caches():
+    # Forgets the frames and weapon images shared across levels (their collision masks go with
+    # them), so a rebuilt level loads every image again instead of reusing the old Surfaces.
+    Player.frame_table = None
+    Enemy.animation_cache.clear()
+    Weapon.image_cache.clear()
+
+class HotReloader:
+    def __init__(self):
+        # Map layer name for each watched CSV file.
+        self.layer_files = {path: style for style, path in map_layers.items()}
+        # Last seen modification time of every watched file.
+        self.mtimes = self.scan()
+        self.last_poll = pygame.time.get_ticks()
+        # Number of batches of changes applied in place, so copies of images (e.g. textures) can be refreshed.
+        self.reload_count = 0
+
+    def scan(self):
+        # Reads the modification time of the map CSVs and every image under the watched folders.
+        mtimes = {}
+        paths = list(self.layer_files) + list(floor_files)
+        for folder in watched_folders:
+            for root, _, files in os.walk(folder):
+                paths.extend(os.path.join(root, name) for name in files if name.endswith('.png'))
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    def poll(self, level):
+        # Checks for changed files every hot_reload_interval milliseconds and applies them to the level.
+        # Returns True when a change cannot be applied in place and the level must be rebuilt.
+        current_time = pygame.time.get_ticks()
+        if current_time - self.last_poll < hot_reload_interval:
+            return False
+        self.last_poll = current_time
+
+        mtimes = self.scan()
+        added = [path for path in mtimes if path not in self.mtimes]
+        removed = [path for path in self.mtimes if path not in mtimes]
+        changed = [path for path, mtime in mtimes.items() if path in self.mtimes and self.mtimes[path] != mtime]
+        self.mtimes = mtimes
+        if not changed and not added and not removed:
+            return False
+
+        start = time.perf_counter()
+        # Added or removed files change folder contents, which only a rebuild picks up.
+        # Their folders are listed from disk from now on, not from the asset bundle.
+        rebuild = bool(added or removed)
+        for path in added + removed:
+            stale_bundle_paths.add(path)
+            stale_bundle_folders.add(os.path.normpath(os.path.dirname(path)))
+        rebuild_floor = False
+        for path in changed:
+            if path in floor_files:
+                # The floor is pre-rendered into chunks, so it is rebuilt rather than patched.
+                # Edited images are read from disk from now on, not from the asset bundle.
+                if path.endswith('.png'):
+                    stale_bundle_paths.add(path)
+                rebuild_floor = True
+            elif path in self.layer_files:
+                style = self.layer_files[path]
+                cells = level.reload_layer(style, import_csv_layout(path))
+                print(f'hot reload: {path}, {cells} cells changed')
+            else:
+                surfaces = reload_image(path)
+                if surfaces is None:
+                    # Resized images cannot be swapped in place.
+                    rebuild = True
+                else:
+                    print(f'hot reload: {path}, {surfaces} surfaces updated')
+
+        if rebuild:
+            print(f'hot reload: {len(changed) + len(added) + len(removed)} files changed, rebuilding the level')
+            clear_asset_caches()
+            return True
+        self.reload_count += 1
+        if rebuild_floor:
+            level.visible_sprites.floor = Floor()
+            print('hot reload: floor rebuilt')
+        print(f'hot reload: applied in {(time.perf_counter() - start) * 1000:.1f} ms')
+        return False
@@ -0,0 +1,89 @@
+import time
+import threading
+from collections import deque
+import pygame
+from settings import *
+
+# Event types counted as inputs.
+input_event_types = (pygame.KEYDOWN, pygame.KEYUP)
+
+class LatencyTracker:
+    def __init__(self, bucket_ms=latency_bucket_ms, buckets=latency_buckets):
+        # Inputs consumed by the tick being simulated: (event time, tick).
+        self.consumed = []
+        # Frames simulated but not yet on screen, oldest first: (tick, [(event time, tick)]).
+        # The render thread presents frames in submission order, so they are matched first in, first out.
+        self.in_flight = deque()
+        self.lock = threading.Lock()
+        self.tick = 0
+
+        # Histograms: milliseconds in fixed-width buckets (the last one collects everything above),
+        # and whole ticks from the consuming tick to the tick its frame was presented in.
+        self.bucket_ms = bucket_ms
+        self.ms_counts = [0] * buckets
+        self.tick_counts = {}
+        self.samples = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def begin_tick(self):
+        self.tick += 1
+
+    def input(self, event):
+        # Timestamps an input event when the game loop receives it. Synthetic events can carry
+        # the time they were generated as 'input_time', which also covers time spent queued.
+        if event.type in input_event_types:
+            self.consumed.append((getattr(event, 'input_time', time.perf_counter()), self.tick))
+
+    def submitted(self):
+        # Marks the end of this tick's simulation; its frame is the one that shows these inputs.
+        with self.lock:
+            self.in_flight.append((self.tick, self.consumed))
+        self.consumed = []
+
+    def presented(self):
+        # Called right after a frame is flipped (on whichever thread flips it).
+        now = time.perf_counter()
+        with self.lock:
+            if not self.in_flight:
+                return
+            frame_tick, inputs = self.in_flight.popleft()
+            ticks = self.tick - frame_tick
+            for event_time, consumed_tick in inputs:
+                self.record((now - event_time) * 1000, ticks)
+
+    def record(self, latency_ms, ticks):
+        self.samples += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        bucket = min(int(latency_ms // self.bucket_ms), len(self.ms_counts) - 1)
+        self.ms_counts[bucket] += 1
+        self.tick_counts[ticks] = self.tick_counts.get(ticks, 0) + 1
+
+    def percentile(self, fraction):
+        # Upper edge of the bucket holding the given fraction of samples.
+        target = fraction * self.samples
+        running = 0
+        for bucket, count in enumerate(self.ms_counts):
+            running += count
+            if running >= target:
+                return (bucket + 1) * self.bucket_ms
+        return self.max_ms
+
+    def report(self):
+        # Summarizes latency with text histograms in milliseconds and in ticks.
+        with self.lock:
+            if not self.samples:
+                return ['latency: no inputs recorded']
+            lines = [f'latency: {self.samples} inputs, mean {self.total_ms / self.samples:.1f} ms, '
+                     f'p50 <= {self.percentile(0.5):g} ms, p95 <= {self.percentile(0.95):g} ms, max {self.max_ms:.1f} ms']
+            peak = max(self.ms_counts)
+            last = max(bucket for bucket, count in enumerate(self.ms_counts) if count)
+            for bucket in range(last + 1):
+                count = self.ms_counts[bucket]
+                low = bucket * self.bucket_ms
+                label = f'{low:>4g}+ ms' if bucket == len(self.ms_counts) - 1 else f'{low:>4g}-{low + self.bucket_ms:g} ms'
+                lines.append(f'  {label:>12} {count:>6} ' + '#' * (count * 40 // peak))
+            for ticks, count in sorted(self.tick_counts.items()):
+                lines.append(f'  {ticks:>3} ticks    {count:>6}')
+        return lines
@@ -0,0 +1,50 @@
+import argparse
+import random
+import sys
+import threading
+import time
+import main
+from settings import *
+from soak import ScriptedPlayer
+
+def main_bench():
+    parser = argparse.ArgumentParser(description='Plays headless with synthetic input and reports input-to-display latency.')
+    parser.add_argument('--seconds', type=float, default=20, help='how long to play')
+    parser.add_argument('--pipelined', action='store_true', help='draw on the render thread')
+    parser.add_argument('--max-p95', type=float, default=0, help='fail if the 95th percentile latency (ms) is above this')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the scripted input')
+    args = parser.parse_args()
+
+    # The game reads these settings at startup.
+    main.latency_tracking = True
+    main.pipelined_rendering = args.pipelined
+    game = main.Game(headless=True)
+    player = ScriptedPlayer(key_bindings, args.seed)
+
+    # Input arrives on its own thread at jittered moments, like a real keyboard, so the time
+    # events wait in the queue (e.g. during the frame pacing sleep) is part of what is measured.
+    stop = threading.Event()
+    def type_keys():
+        jitter = random.Random(args.seed)
+        while not stop.wait(jitter.uniform(0.5, 1.5) / fps):
+            player.step()
+    typist = threading.Thread(target=type_keys, daemon=True)
+    typist.start()
+
+    end = time.perf_counter() + args.seconds
+    while time.perf_counter() < end:
+        game.frame()
+    stop.set()
+    typist.join()
+
+    latency = game.latency
+    game.shutdown()
+
+    # A non-zero exit status lets CI catch latency regressions.
+    p95 = latency.percentile(0.95)
+    if args.max_p95 and p95 > args.max_p95:
+        print(f'FAIL: p95 latency <= {p95:g} ms (limit {args.max_p95:g} ms)')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main_bench()
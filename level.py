@@ -1,179 +1,415 @@
 import pygame
+import weakref
 from settings import *
 
 from tile import Tile
 from player import Player
 from support import *
 from random import choice, randint
+from itertools import count
 from weapon import Weapon
 from ui import UI
-from enemy import Enemy
 from magic import MagicPlayer, AnimationPlayer
+from floor import Floor
+from pipeline import FrameSnapshot, HudState, draw_frame
+from controls import InputState
+from spawner import EnemyPool, WaveSpawner
+from ai_scheduler import AIScheduler
+from line_of_sight import LineOfSight
+from spatial import SpatialIndex
+from systems import SystemPipeline
+from startup_trace import trace_stage
 
 class Level:
-    def __init__(self):
+    def __init__(self, input_state=None):
         # Gets the display surface.
         self.display_surface = pygame.display.get_surface()
 
+        # Action states driving the player; a fresh one is used when none is injected.
+        self.input_state = input_state if input_state is not None else InputState()
+
         # Initializes sprite groups.
         # YSortCameraGroup handles drawing sprites sorted by Y-coordinate for depth.
-        self.visible_sprites = YSortCameraGroup()
+        with trace_stage('floor'):
+            self.visible_sprites = YSortCameraGroup()
         # Obstacles stop movement.
         self.obstacle_sprites = pygame.sprite.Group()
         # Attackable sprites include enemies and breakable grass.
         self.attackable_sprites = pygame.sprite.Group()
         # Attack sprites are weapons and magic projectiles created by the player.
         self.attack_sprites = pygame.sprite.Group()
+        # Enemies and particle effects, so per-frame systems only visit what they update.
+        self.enemy_sprites = pygame.sprite.Group()
+        self.particle_sprites = pygame.sprite.Group()
+
+        # Stable IDs for players and enemies, used when replicating state over the network.
+        self.entity_ids = count(1)
+        # Every player in the level; self.player is the locally controlled one.
+        self.players = []
+
+        # Grid of sight-blocking tiles, used by ranged enemies.
+        self.line_of_sight = LineOfSight()
+        # Grass and enemies filed by map cell, so area attacks only test what is near them.
+        self.attack_index = SpatialIndex()
 
-        self.current_attack = None
+        # Pre-built enemies that are reset and reused instead of constructed on each spawn.
+        with trace_stage('enemy pool'):
+            self.enemy_pool = EnemyPool([self.visible_sprites, self.attackable_sprites, self.enemy_sprites], self.obstacle_sprites, self.add_exp, self.entity_ids, self.line_of_sight)
+        # Map positions of the enemies placed in map_Entities.csv, reused as wave spawn points.
+        self.spawn_points = []
+
+        # Initializes the UI overlay; its minimap is filled in as the map is placed.
+        with trace_stage('UI'):
+            self.ui = UI()
+
+        # Loads every weapon image (with its collision mask) before play, like the frame tables.
+        with trace_stage('weapons'):
+            Weapon.load_images()
 
         # Parses map data and spawns sprites.
-        self.create_map()
+        with trace_stage('create_map'):
+            self.create_map()
+
+        # Spreads enemy AI decisions across frames within a time budget.
+        self.ai_scheduler = AIScheduler()
+
+        # Optionally keeps re-populating the map with waves of pooled enemies.
+        self.wave_spawner = WaveSpawner(self.enemy_pool, self.spawn_points) if wave_spawning else None
 
-        # Initializes the UI overlay.
-        self.ui = UI()
-        
         # Initializes magic and particle systems.
-        self.animation_player = AnimationPlayer()
-        self.magic_player = MagicPlayer(self.animation_player)
+        with trace_stage('particles'):
+            with trace_stage('AnimationPlayer frames'):
+                self.animation_player = AnimationPlayer()
+            with trace_stage('MagicPlayer frames'):
+                self.magic_player = MagicPlayer(self.animation_player)
+
+        # Off-screen enemies animate once every this many frames (set by the quality governor).
+        self.offscreen_animation = 1
+
+        # The frame's work, as an ordered list of named systems that can be switched off and timed.
+        self.systems = SystemPipeline([
+            ('input', self.input_system),
+            ('ai', self.ai_system),
+            ('movement', self.movement_system),
+            ('combat', self.combat_system),
+            ('animation', self.animation_system),
+            ('particles', self.particle_system),
+            ('waves', self.wave_system)
+        ])
 
     
     def create_map(self):
         # Dictionary linking map layer names to CSV file paths.
-        layouts = {
-            'boundary': import_csv_layout('map/map_FloorBlocks.csv'),
-            'grass': import_csv_layout('map/map_Grass.csv'),
-            'object': import_csv_layout('map/map_Objects.csv'),
-            'entities': import_csv_layout('map/map_Entities.csv')
-        }
+        with trace_stage('map layouts'):
+            self.layouts = {style: import_csv_layout(path) for style, path in map_layers.items()}
         # Dictionary loading graphics for specific layers.
-        graphics = {
-            'grass': import_folder('graphics/Grass'),
-            'object': import_folder('graphics/Objects')
-        }
+        with trace_stage('map graphics'):
+            self.map_graphics = {
+                'grass': import_folder('graphics/grass'),
+                'object': import_folder('graphics/objects')
+            }
+            # Grass can be cut, so its collision masks are built up front.
+            for image in self.map_graphics['grass']:
+                get_mask(image)
+        # Sprite created for each (layer, column, row), so single cells can be rebuilt later.
+        self.layer_sprites = {}
         
         # Iterates over each layout and tile to place sprites.
-        for style, layout in layouts.items():
-            for row_index, row in enumerate(layout):
-                for col_index, col in enumerate(row):
-                    if col != '-1':
-                        x = col_index * tile_size
-                        y = row_index * tile_size
-                        
-                        # Invisible boundaries for collision.
-                        if style == 'boundary':
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 'invisible')
-                        
-                        # Grass tiles (now destructible).
-                        if style == 'grass':
-                            random_grass_image = choice(graphics['grass'])
-                            Tile(
-                                (x, y), 
-                                [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 
-                                'grass', 
-                                random_grass_image)
-                        
-                        # Object tiles (trees, rocks, etc.).
-                        if style == 'object':
-                            object_image = graphics['object'][int(col)]
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 'object', object_image)
-                        
-                        # Entities (Player and Enemies).
-                        if style == 'entities':
-                            if col.strip() == '394':
-                                self.player = Player(
-                                    (x, y), 
-                                    [self.visible_sprites], 
-                                    self.obstacle_sprites, 
-                                    self.create_attack, 
-                                    self.destroy_attack, 
-                                    self.create_magic)
-                            else:
-                                # Determine monster type based on ID.
-                                if col.strip() == '390': monster_name = 'bamboo'
-                                elif col.strip() == '391': monster_name = 'spirit'
-                                elif col.strip() == '392': monster_name = 'raccoon'
-                                else: monster_name = 'squid'
-                                
-                                Enemy(monster_name, (x, y), [self.visible_sprites, self.attackable_sprites], self.obstacle_sprites, self.add_exp)
-
-    def create_attack(self):
+        with trace_stage('place tiles'):
+            for style, layout in self.layouts.items():
+                for row_index, row in enumerate(layout):
+                    for col_index, col in enumerate(row):
+                        if col != '-1':
+                            self.create_cell(style, col_index, row_index, col)
+
+    def create_cell(self, style, col_index, row_index, col):
+        # Creates the sprite for one map cell.
+        x = col_index * tile_size
+        y = row_index * tile_size
+        key = (style, col_index, row_index)
+
+        # Boundaries, grass and objects all block line of sight.
+        if style in ('boundary', 'grass', 'object'):
+            self.line_of_sight.add_blocker((col_index, row_index))
+            self.ui.minimap.add(style, (col_index, row_index))
+        
+        # Invisible boundaries for collision; they have nothing to draw, so they stay out of the visible group.
+        if style == 'boundary':
+            self.layer_sprites[key] = Tile((x, y), [self.obstacle_sprites], 'invisible')
+        
+        # Grass tiles (now destructible).
+        if style == 'grass':
+            random_grass_image = choice(self.map_graphics['grass'])
+            self.layer_sprites[key] = Tile(
+                (x, y), 
+                [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites], 
+                'grass', 
+                random_grass_image)
+            self.attack_index.add(self.layer_sprites[key])
+        
+        # Object tiles (trees, rocks, etc.).
+        if style == 'object':
+            object_image = self.map_graphics['object'][int(col)]
+            self.layer_sprites[key] = Tile((x, y), [self.visible_sprites, self.obstacle_sprites], 'object', object_image)
+        
+        # Entities (Player and Enemies).
+        if style == 'entities':
+            if col.strip() == '394':
+                self.player_spawn = (x, y)
+                # Only the first load spawns the player; later edits just move the start point.
+                if not self.players:
+                    self.player = self.add_player(self.input_state)
+            else:
+                # Determine monster type based on ID.
+                if col.strip() == '390': monster_name = 'bamboo'
+                elif col.strip() == '391': monster_name = 'spirit'
+                elif col.strip() == '392': monster_name = 'raccoon'
+                else: monster_name = 'squid'
+                
+                self.layer_sprites[key] = self.enemy_pool.acquire(monster_name, (x, y))
+                self.spawn_points.append((x, y))
+
+    def remove_cell(self, style, col_index, row_index):
+        # Removes whatever one map cell created, if it is still in the level.
+        sprite = self.layer_sprites.pop((style, col_index, row_index), None)
+        if style == 'entities':
+            position = (col_index * tile_size, row_index * tile_size)
+            if position in self.spawn_points:
+                self.spawn_points.remove(position)
+            if sprite is not None and sprite.alive():
+                self.enemy_pool.despawn(sprite)
+        elif sprite is not None:
+            # Cut grass has already given up its line-of-sight blocker.
+            if sprite.alive():
+                self.line_of_sight.remove_blocker((col_index, row_index))
+                self.ui.minimap.remove(style, (col_index, row_index))
+            self.attack_index.remove(sprite)
+            sprite.kill()
+
+    def reload_layer(self, style, layout):
+        # Diffs a changed map layer against the loaded one and rebuilds only the cells that differ.
+        # Returns the number of cells changed.
+        old_layout = self.layouts[style]
+        changed = 0
+        for row_index in range(max(len(old_layout), len(layout))):
+            old_row = old_layout[row_index] if row_index < len(old_layout) else []
+            new_row = layout[row_index] if row_index < len(layout) else []
+            for col_index in range(max(len(old_row), len(new_row))):
+                old_value = old_row[col_index] if col_index < len(old_row) else '-1'
+                new_value = new_row[col_index] if col_index < len(new_row) else '-1'
+                if old_value.strip() != new_value.strip():
+                    self.remove_cell(style, col_index, row_index)
+                    if new_value.strip() != '-1':
+                        self.create_cell(style, col_index, row_index, new_value)
+                    changed += 1
+        self.layouts[style] = layout
+        return changed
+
+    def add_player(self, input_state):
+        # Spawns a player at the map's player start, driven by the given input state.
+        player = Player(
+            self.player_spawn, 
+            [self.visible_sprites], 
+            self.obstacle_sprites, 
+            self.create_attack, 
+            self.destroy_attack, 
+            self.create_magic,
+            input_state)
+        player.entity_id = next(self.entity_ids)
+        self.players.append(player)
+        return player
+
+    def remove_player(self, player):
+        # Removes a player (and any weapon it is holding) from the level.
+        self.destroy_attack(player)
+        player.kill()
+        self.players.remove(player)
+
+    def respawn_player(self, player):
+        # Puts a defeated player back at the start with full health and energy.
+        self.destroy_attack(player)
+        player.health = player.stats['health']
+        player.energy = player.stats['energy']
+        player.hitbox.midbottom = pygame.Rect(self.player_spawn, (tile_size, tile_size)).midbottom
+        player.pos.update(player.hitbox.topleft)
+        player.rect.midbottom = player.hitbox.midbottom
+        player.add(self.visible_sprites)
+
+    def create_attack(self, player):
         # creates a Weapon sprite and adds it to visible and attack groups.
-        self.current_attack = Weapon(self.player, [self.visible_sprites, self.attack_sprites])
+        player.current_attack = Weapon(player, [self.visible_sprites, self.attack_sprites])
 
-    def create_magic(self, style, strength, cost):
+    def create_magic(self, player, style, strength, cost):
         # Triggers magic spells via the magic_player.
         if style == 'heal':
-            self.magic_player.heal(self.player, strength, cost, [self.visible_sprites])
+            self.magic_player.heal(player, strength, cost, [self.visible_sprites, self.particle_sprites])
         
         if style == 'flame':
-            self.magic_player.flame(self.player, cost, [self.visible_sprites, self.attack_sprites])
+            # The flame's particles are only drawn; its damage is resolved once, against its area.
+            area = self.magic_player.flame(player, cost, [self.visible_sprites, self.particle_sprites])
+            if area:
+                self.area_attack(player, area, 'magic')
+
+    def area_attack(self, player, area, attack_type):
+        # Hits every grass tile and enemy overlapping the area once, found through the spatial index.
+        for target_sprite in self.attack_index.query(area):
+            if target_sprite.sprite_type == 'grass':
+                self.cut_grass(target_sprite)
+            else:
+                target_sprite.get_damage(player, attack_type)
 
-    def destroy_attack(self):
+    def cut_grass(self, grass):
+        # Destroys a grass tile: spawns leaf particles and removes it from the level.
+        pos = grass.rect.center
+        offset = pygame.math.Vector2(0, 75)
+        for _ in range(self.animation_player.burst_size(randint(3, 6))):
+            # Pick a random leaf particle type.
+            self.animation_player.create_particles(f'leaf{randint(1, 6)}', pos - offset, [self.visible_sprites, self.particle_sprites])
+        grass.kill()
+        self.attack_index.remove(grass)
+        # The cut grass no longer blocks sight, and disappears from the minimap.
+        cell = self.line_of_sight.cell(grass.hitbox.center)
+        self.line_of_sight.remove_blocker(cell)
+        self.ui.minimap.remove('grass', cell)
+
+    def destroy_attack(self, player):
         # Removes the weapon sprite when the attack animation ends.
-        if self.current_attack:
-            self.current_attack.kill()
-        self.current_attack = None
+        if player.current_attack:
+            player.current_attack.kill()
+        player.current_attack = None
+
+    def add_exp(self, amount, player=None):
+        # Callback to add EXP to the player who landed the killing blow (the local player by default).
+        (player or self.player).exp += amount
 
-    def add_exp(self, amount):
-        # Callback to add EXP to the player.
-        self.player.exp += amount
+    def pixel_collisions(self, sprite, group):
+        # Sprites in the group whose visible pixels touch the sprite's. The cheap rect test runs
+        # first; only overlapping rects compare their cached masks.
+        mask = get_mask(sprite.image)
+        hits = []
+        for target in pygame.sprite.spritecollide(sprite, group, False):
+            offset = (target.rect.x - sprite.rect.x, target.rect.y - sprite.rect.y)
+            if mask.overlap(get_mask(target.image), offset):
+                hits.append(target)
+        return hits
 
     def player_attack_logic(self):
         # Checks collisions between player's attacks and attackable sprites.
         if self.attack_sprites:
             for attack_sprite in self.attack_sprites:
-                collision_sprites = pygame.sprite.spritecollide(attack_sprite, self.attackable_sprites, False)
+                collision_sprites = self.pixel_collisions(attack_sprite, self.attackable_sprites)
                 if collision_sprites:
                     for target_sprite in collision_sprites:
                         if target_sprite.sprite_type == 'grass':
-                            # Logic for destroying grass: spawn leaf particles and kill sprite.
-                            pos = target_sprite.rect.center
-                            offset = pygame.math.Vector2(0, 75)
-                            for _ in range(randint(3, 6)):
-                                # Pick a random leaf particle type.
-                                self.animation_player.create_particles(f'leaf{randint(1, 6)}', pos - offset, [self.visible_sprites])
-                            target_sprite.kill()
+                            self.cut_grass(target_sprite)
                         else:
-                            # Logic for damaging enemies.
-                            target_sprite.get_damage(self.player, attack_sprite.sprite_type)
+                            # Logic for damaging enemies, credited to the player who made the attack.
+                            target_sprite.get_damage(attack_sprite.owner, attack_sprite.sprite_type)
 
     def damage_player(self):
-        # Checks collisions between the player and enemies.
+        # Checks collisions between the players and enemies.
         if self.attackable_sprites:
-            # Filter the list to only check collision with enemies, not grass.
-            enemies = [sprite for sprite in self.attackable_sprites if sprite.sprite_type == 'enemy']
-            collision_sprites = pygame.sprite.spritecollide(self.player, enemies, False)
+            # Only enemies hurt players, not grass.
+            enemies = self.enemy_sprites.sprites()
+            for player in self.players:
+                collision_sprites = self.pixel_collisions(player, enemies)
             
-            if collision_sprites:
-                for enemy in collision_sprites:
-                    # Logic runs only if the player is currently vulnerable (not in i-frames).
-                    if self.player.vulnerable:
-                        self.player.get_damage(enemy.attack_damage)
-                        # Triggers the 'leaf_attack' hit effect exactly once per hit.
-                        self.animation_player.create_particles('leaf_attack', self.player.rect.center, [self.visible_sprites])
+                if collision_sprites:
+                    for enemy in collision_sprites:
+                        # Logic runs only if the player is currently vulnerable (not in i-frames).
+                        if player.vulnerable:
+                            player.get_damage(enemy.attack_damage)
+                            # Triggers the 'leaf_attack' hit effect exactly once per hit.
+                            self.animation_player.create_particles('leaf_attack', player.rect.center, [self.visible_sprites, self.particle_sprites])
 
-    def run(self):
-        # Updates all visible sprites.
-        self.visible_sprites.update()
-        
-        # custom_draw handles the camera offset and depth sorting.
-        self.visible_sprites.custom_draw(self.player)
-        
-        # Updates enemy AI logic.
-        self.visible_sprites.enemy_update(self.player)
-        
-        # Handles combat collisions.
+    def input_system(self):
+        # Turns each player's input into movement direction, attacks and spells.
+        for player in self.players:
+            player.input()
+
+    def ai_system(self):
+        # Enemy decisions, time-sliced by the scheduler; each enemy chases its nearest player.
+        players = self.players
+
+        def target_for(enemy):
+            if len(players) == 1:
+                return players[0]
+            return min(players, key=lambda player: enemy.get_player_distance_direction(player)[0])
+
+        self.ai_scheduler.run(self.enemy_sprites.sprites(), target_for)
+
+    def movement_system(self):
+        # Moves players and enemies, then refiles enemies that moved into other cells.
+        for player in self.players:
+            player.movement()
+        for enemy in self.enemy_sprites:
+            enemy.movement()
+            self.attack_index.move(enemy)
+
+    def combat_system(self):
+        # Resolves hits, then deaths and level-ups.
         self.player_attack_logic()
         self.damage_player()
-        
-        # Draws the UI elements.
-        self.ui.display(self.player)
-        
-        # Checks if all enemies are defeated to display the victory message.
-        enemies_left = [s for s in self.attackable_sprites if s.sprite_type == 'enemy']
-        if len(enemies_left) == 0:
-            self.ui.display_victory_message()
+        for enemy in self.enemy_sprites.sprites():
+            enemy.check_death()
+        for player in self.players:
+            player.check_level_up()
+            player.check_death()
+
+    def animation_system(self):
+        for player in self.players:
+            player.animate()
+        # Under load, off-screen enemies skip frames (in turns); attacking ones always animate
+        # because the end of the animation ends the attack.
+        every = self.offscreen_animation
+        view_rect = self.visible_sprites.view_rect
+        turn = self.systems.frames
+        for enemy in self.enemy_sprites:
+            if every > 1 and not enemy.attacking and (turn + enemy.entity_id) % every and not view_rect.colliderect(enemy.rect):
+                continue
+            enemy.animate()
+
+    def apply_quality(self, quality):
+        # Applies a quality level from the governor (see quality_levels in settings.py).
+        self.animation_player.particle_density = quality['particles']
+        self.offscreen_animation = quality['offscreen_animation']
+        # A new scale means a new scene and an empty scaled-image cache, so an unchanged one is kept.
+        if quality['render_scale'] != self.visible_sprites.render_scale:
+            self.visible_sprites.set_render_scale(quality['render_scale'])
+        self.ai_scheduler.budget = quality['ai_budget_ms'] / 1000
+
+    def particle_system(self):
+        # Advances particle effects; finished ones remove themselves.
+        for particle in self.particle_sprites.sprites():
+            particle.animate()
+
+    def wave_system(self):
+        # Spawns the next wave of enemies when it is due.
+        if self.wave_spawner:
+            self.wave_spawner.update(self.player)
+
+    def update(self):
+        # Runs every enabled system once, in order. Static tiles are never visited.
+        self.systems.run()
+
+    def snapshot(self):
+        # Captures an immutable description of the current frame for drawing.
+        offset, sprites = self.visible_sprites.render_list(self.player)
+
+        # Minimap marker positions; no enemies left means victory.
+        enemies = tuple(enemy.hitbox.center for enemy in self.enemy_sprites)
+        players = tuple(player.hitbox.center for player in self.players)
+        hud = HudState(
+            self.player.health, self.player.stats['health'],
+            self.player.energy, self.player.stats['energy'],
+            self.player.exp, self.player.weapon_index, self.player.magic_index,
+            not enemies, players, enemies, self.ui.minimap.take_changes())
+        return FrameSnapshot(self.visible_sprites, self.ui, offset, sprites, hud, self.visible_sprites.scaling)
+
+    def run(self):
+        # Updates the game state, then draws the world and the UI overlay.
+        self.update()
+        self.systems.timed('render', draw_frame, self.display_surface, self.snapshot())
 
 
 class YSortCameraGroup(pygame.sprite.Group):
@@ -186,34 +422,94 @@ class YSortCameraGroup(pygame.sprite.Group):
         self.half_width = self.display_surface.get_size()[0] // 2
         self.half_height = self.display_surface.get_size()[1] // 2
         self.offset = pygame.math.Vector2()
+        # Part of the world the camera sees, in world coordinates.
+        self.view_rect = pygame.Rect((0, 0), self.display_surface.get_size())
 
-        # Loads the background floor image.
-        self.floor_surface = pygame.image.load("graphics/tilemap/ground.png").convert()
-        self.floor_rect = self.floor_surface.get_rect(topleft=(0, 0))
+        # Loads the background floor as cached chunks.
+        self.floor = Floor()
 
+        self.set_render_scale(render_scale)
 
-    def custom_draw(self, player):
+    def set_render_scale(self, scale):
+        # Below 1, the world is drawn into a smaller offscreen scene that is scaled up to the window
+        # in one step. Images are scaled down to match once each, on first use.
+        # The scale, scene and scaled-image cache are swapped as one tuple, and each snapshot
+        # carries the tuple it was taken with, so a frame being drawn on the render thread
+        # keeps a consistent set whatever the simulation switches to meanwhile.
+        if scale < 1:
+            scene_size = (round(self.display_surface.get_width() * scale),
+                          round(self.display_surface.get_height() * scale))
+            scene = pygame.Surface(scene_size).convert()
+            register_surface(scene, 'render scene')
+            self.scaling = (scale, scene, weakref.WeakKeyDictionary())
+            self.render_scale = scale
+        else:
+            self.scaling = None
+            self.render_scale = 1
+
+    def clear_scaled_images(self):
+        # Drops the scaled copies (e.g. after hot reload changed images in place) by switching
+        # to a fresh cache; frames already snapshotted keep using the old one.
+        if self.scaling:
+            scale, scene, scaled_images = self.scaling
+            self.scaling = (scale, scene, weakref.WeakKeyDictionary())
+
+    def render_list(self, player):
         # updates the camera offset based on the player's position.
         self.offset.x = player.rect.centerx - self.half_width
         self.offset.y = player.rect.centery - self.half_height
+        offset = pygame.math.Vector2(self.offset)
         
         # Key function for sorting sprites by their Y-coordinate (creates pseudo-3D overlap).
         def sort_key(sprite):
             if hasattr(sprite, 'hitbox'):
                 return sprite.hitbox.centery
             return sprite.rect.centery
-        
-        # Draws the floor first, offset by the camera position.
-        floor_offset_pos = self.floor_rect.topleft - self.offset
-        self.display_surface.blit(self.floor_surface, floor_offset_pos)
-
-        # Draws all sprites, sorted by their Y position.
-        for sprite in sorted(self.sprites(), key=sort_key):
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
-
-    def enemy_update(self, player):
-        # Calls the AI update method for all Enemy sprites in this group.
-        enemy_sprites = [sprite for sprite in self.sprites() if hasattr(sprite, 'sprite_type') and sprite.sprite_type == 'enemy']
-        for enemy in enemy_sprites:
-            enemy.enemy_update(player)
\ No newline at end of file
+
+        # Builds (image, screen position, depth) entries for the sprites in view, sorted by their Y position.
+        self.view_rect.topleft = (int(offset.x), int(offset.y))
+        view_rect = self.view_rect
+        # Images with nothing visible are skipped; the set is empty for the shipped assets,
+        # so the check normally costs one truth test.
+        empty = empty_surfaces
+        sprites = []
+        for sprite in self.sprites():
+            if not view_rect.colliderect(sprite.rect):
+                continue
+            if empty and sprite.image in empty:
+                continue
+            depth = sort_key(sprite)
+            sprites.append((sprite.image, (sprite.rect.left - offset.x, sprite.rect.top - offset.y), depth))
+        sprites.sort(key=lambda entry: entry[2])
+        return offset, tuple(sprites)
+
+    def draw_render_list(self, offset, sprites, scaling=None):
+        # Draws at full scale, or through the scene of the given (scale, scene, scaled images).
+        if scaling:
+            self.draw_scaled(offset, sprites, scaling)
+            return
+
+        # Draws the floor first, blitting only the chunks visible to the camera.
+        self.floor.draw(self.display_surface, offset)
+
+        # Draws all sprites in depth order.
+        self.display_surface.blits([(image, pos) for image, pos, depth in sprites], False)
+
+    def draw_scaled(self, offset, sprites, scaling):
+        # Draws the floor and sprites into the smaller scene, then scales it up over the whole window.
+        scale, scene, scaled_images = scaling
+
+        def scaled(image):
+            # Returns an image shrunk by the render scale, scaling it the first time it is drawn.
+            scaled_image = scaled_images.get(image)
+            if scaled_image is None:
+                size = (max(1, round(image.get_width() * scale)), max(1, round(image.get_height() * scale)))
+                scaled_image = scaled_images[image] = pygame.transform.scale(image, size)
+            return scaled_image
+
+        scene.fill('black')
+        view_rect = pygame.Rect((int(offset.x), int(offset.y)), self.display_surface.get_size())
+        scene.blits([(scaled(chunk), (round((x - offset.x) * scale), round((y - offset.y) * scale)))
+                          for chunk, (x, y) in self.floor.visible_chunks(view_rect)], False)
+        scene.blits([(scaled(image), (round(x * scale), round(y * scale))) for image, (x, y), depth in sprites], False)
+        pygame.transform.scale(scene, self.display_surface.get_size(), self.display_surface)
@@ -0,0 +1,63 @@
+from settings import *
+
+class LineOfSight:
+    def __init__(self):
+        # Number of sight-blocking tiles in each (column, row) cell.
+        self.blockers = {}
+        # Cached results keyed by (from cell, to cell); cleared whenever the grid changes.
+        self.cache = {}
+
+    def cell(self, pos):
+        # Converts a world position to its (column, row) grid cell.
+        return (int(pos[0]) // tile_size, int(pos[1]) // tile_size)
+
+    def add_blocker(self, cell):
+        self.blockers[cell] = self.blockers.get(cell, 0) + 1
+        self.cache.clear()
+
+    def remove_blocker(self, cell):
+        # Called when a blocking tile (e.g. grass) is destroyed.
+        count = self.blockers.get(cell, 0) - 1
+        if count > 0:
+            self.blockers[cell] = count
+        else:
+            self.blockers.pop(cell, None)
+        self.cache.clear()
+
+    def is_clear(self, start, end):
+        # True if nothing blocks sight between two world positions.
+        key = (self.cell(start), self.cell(end))
+        result = self.cache.get(key)
+        if result is None:
+            if len(self.cache) >= los_cache_limit:
+                self.cache.clear()
+            result = self.cache[key] = self.raycast(*key)
+        return result
+
+    def raycast(self, start_cell, end_cell):
+        # Walks the grid cells crossed by the line between two cell centers (DDA traversal)
+        # and reports whether any cell between them holds a blocker.
+        col, row = start_cell
+        end_col, end_row = end_cell
+        dx = end_col - col
+        dy = end_row - row
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+
+        # Distance along the ray (as a fraction of its length) to cross one cell in x / y,
+        # and to the first crossing. The ray starts at a cell center, half a cell from each edge.
+        t_delta_x = 1 / abs(dx) if dx else float('inf')
+        t_delta_y = 1 / abs(dy) if dy else float('inf')
+        t_max_x = t_delta_x / 2
+        t_max_y = t_delta_y / 2
+
+        while (col, row) != (end_col, end_row):
+            if t_max_x < t_max_y:
+                col += step_x
+                t_max_x += t_delta_x
+            else:
+                row += step_y
+                t_max_y += t_delta_y
+            if (col, row) != (end_col, end_row) and (col, row) in self.blockers:
+                return False
+        return True
@@ -2,6 +2,8 @@ import pygame
 from settings import *
 from support import import_folder
 from random import randint
+from animation import direction_vectors
+from spatial import line_area
 
 class MagicPlayer:
     def __init__(self, animation_player):
@@ -32,19 +34,20 @@ class MagicPlayer:
             self.animation_player.create_particles('heal', player.rect.center + pygame.math.Vector2(0, -60), groups)
 
     def flame(self, player, cost, groups):
+        # Casts a flame in front of the player, returning the area it hits (None without enough energy).
+        # The particles are only visual; the level resolves the damage once against the area.
         # Checks if the player has enough energy.
         if player.energy >= cost:
             # Deducts the energy cost.
             player.energy -= cost
             
             # Determines the direction the player is facing to throw the flame.
-            if player.status.split('_')[0] == 'right': direction = pygame.math.Vector2(1, 0)
-            elif player.status.split('_')[0] == 'left': direction = pygame.math.Vector2(-1, 0)
-            elif player.status.split('_')[0] == 'up': direction = pygame.math.Vector2(0, -1)
-            else: direction = pygame.math.Vector2(0, 1)
+            direction = pygame.math.Vector2(direction_vectors[player.facing])
 
-            # Spawns multiple flame particles in a line to simulate a flamethrower effect.
-            for i in range(1, 6):
+            # Spawns multiple flame particles in a line to simulate a flamethrower effect
+            # (fewer, spaced further apart, when the particle density is lowered).
+            step = max(1, round(1 / self.animation_player.particle_density))
+            for i in range(1, flame_length + 1, step):
                 if direction.x: # Horizontal throw
                     offset_x = (direction.x * i) * tile_size
                     # Adds randomness to position for a natural fire look.
@@ -56,6 +59,7 @@ class MagicPlayer:
                     x = player.rect.centerx + randint(-tile_size // 3, tile_size // 3)
                     y = player.rect.centery + offset_y + randint(-tile_size // 3, tile_size // 3)
                     self.animation_player.create_particles('flame', (x, y), groups)
+            return line_area(player.rect.center, direction, flame_length)
 
 class AnimationPlayer:
     def __init__(self):
@@ -87,12 +91,19 @@ class AnimationPlayer:
             'leaf5': import_folder('graphics/particles/leaf5'),
             'leaf6': import_folder('graphics/particles/leaf6'),
         }
-    
+
+        # Share of burst particles actually spawned, lowered by the quality governor under load.
+        self.particle_density = 1.0
+
+    def burst_size(self, count):
+        # Number of particles to spawn for a burst of 'count', at least one.
+        return max(1, round(count * self.particle_density))
+
     def create_particles(self, animation_type, pos, groups):
         # Retrieves the frames for the requested animation type.
         animation_frames = self.frames[animation_type]
         # Creates a ParticleEffect sprite at the given position.
-        ParticleEffect(pos, animation_frames, groups)
+        return ParticleEffect(pos, animation_frames, groups)
 
 class ParticleEffect(pygame.sprite.Sprite):
     def __init__(self, pos, animation_frames, groups):
@@ -116,7 +127,3 @@ class ParticleEffect(pygame.sprite.Sprite):
         else:
             # Otherwise update the image to the current frame.
             self.image = self.frames[int(self.frame_index)]
-
-    def update(self):
-        # Called every frame to run the animation logic.
-        self.animate()
\ No newline at end of file
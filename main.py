@@ -1,56 +1,261 @@
-import pygame, sys
+import pygame, sys, os, time
 from settings import *
 from level import Level
+from pipeline import RenderThread
+from controls import InputState
+from memory_profile import MemoryProfiler
+from capture import FrameRecorder
+from hot_reload import HotReloader
+from support import surface_format_report
+from latency import LatencyTracker
+from quality import QualityGovernor
+from gc_control import GCController
+import startup_trace
+from startup_trace import StartupTracer, trace_stage
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False):
+        # Uses SDL's dummy drivers so the game can run without a window or sound device.
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+        # Records the startup timeline until the first frame (a tracer may already be running,
+        # see startup_trace.py).
+        self.startup_tracer = startup_trace.active_tracer or (StartupTracer() if startup_tracing else None)
+        startup_trace.active_tracer = self.startup_tracer
+
+        # Starts tracing allocations before anything is loaded, so the whole session is covered.
+        self.memory_profiler = None
+        if memory_profiling:
+            self.memory_profiler = MemoryProfiler()
+            self.memory_profiler.start()
+
         # Initializes the Pygame library modules to allow usage of its features.
-        pygame.init()
-        
+        with trace_stage('pygame.init'):
+            pygame.init()
+
         # Creates the main display window with the width and height specified in the settings file.
-        self.screen = pygame.display.set_mode((width, height))
-        
+        # The texture backend draws in its own window, so the display window is kept hidden.
+        self.texture_renderer = None
+        with trace_stage('set_mode'):
+            if render_backend == 'texture':
+                # Imported only here: it needs pygame's experimental _sdl2 module.
+                from texture_renderer import TextureRenderer
+                self.screen = pygame.display.set_mode((width, height), pygame.HIDDEN)
+                self.texture_renderer = TextureRenderer('True Game', (width, height))
+            else:
+                self.screen = pygame.display.set_mode((width, height))
+
         # Sets the title of the window to 'True Game'.
         pygame.display.set_caption('True Game')
-        
+
         # Creates a clock object to track time and control the game's framerate.
         self.clock = pygame.time.Clock()
 
+        # Tracks pressed/held/released actions from keyboard events.
+        self.input_state = InputState()
+
+        # Times garbage collection pauses and moves collections out of the frame's work.
+        self.gc_controller = GCController() if gc_control else None
+
+        # Lowers quality under load (see quality_levels in settings.py).
+        self.governor = QualityGovernor() if quality_governor else None
+
         # Instantiates the Level class, which handles the map, player, and enemies.
-        self.level = Level()
+        self.load_level()
 
-    def run(self):
-        # Starts the main game loop which runs indefinitely until the user quits.
-        while True:
-            # Iterates through all events (like key presses, mouse clicks) in the event queue.
-            for event in pygame.event.get():
-                # Checks if the user clicked the close button on the window.
-                if event.type == pygame.QUIT:
-                    # Uninitializes Pygame modules and closes the window.
-                    pygame.quit()
-                    # Terminates the Python script.
-                    sys.exit()
-
-            # Fills the entire screen with black to clear the previous frame's drawings.
-            self.screen.fill('black')
-            
+        # Optionally measures how long inputs take to reach the screen.
+        self.latency = LatencyTracker() if latency_tracking else None
+
+        # Optionally records every drawn frame, encoding on background workers.
+        self.recorder = FrameRecorder(self.screen) if capture_enabled and not self.texture_renderer else None
+
+        # Optionally watches map and image files and applies edits while the game runs.
+        self.hot_reloader = HotReloader() if hot_reload else None
+
+        # Optionally draws frames on a render thread, one frame behind the simulation.
+        self.render_thread = None
+        if pipelined_rendering and not self.texture_renderer:
+            self.render_thread = RenderThread(
+                self.screen,
+                self.recorder.capture if self.recorder else None,
+                self.latency.presented if self.latency else None)
+            self.render_thread.start()
+
+        # Lists the pixel format of every Surface in use.
+        if surface_audit:
+            sprites = [(sprite.image, type(sprite).__name__) for sprite in self.level.visible_sprites]
+            print('\n'.join(surface_format_report(sprites)))
+
+        # Takes the memory baseline once the level is loaded.
+        if self.memory_profiler:
+            print(self.memory_profiler.summary(self.memory_profiler.mark_baseline(self.level)))
+            self.last_memory_sample = pygame.time.get_ticks()
+
+    def load_level(self):
+        # Builds a fresh level at the current quality.
+        with trace_stage('Level'):
+            self.level = Level(self.input_state)
+        if self.governor:
+            self.level.apply_quality(self.governor.settings)
+        if self.gc_controller:
+            with trace_stage('gc level_loaded'):
+                self.gc_controller.level_loaded()
+
+    def finish_startup_trace(self, path=startup_trace_path):
+        # Stops recording the startup, writes its timeline and prints a summary.
+        if self.startup_tracer:
+            self.startup_tracer.finish()
+            self.startup_tracer.write(path)
+            print('\n'.join(self.startup_tracer.report()))
+            print(f'Startup trace written to {path}')
+            self.startup_tracer = None
+            startup_trace.active_tracer = None
+
+    def frame(self):
+        # Runs one iteration of the game loop.
+        frame_start = time.perf_counter()
+        # Starts a new input tick so pressed/released edges last exactly one frame.
+        self.input_state.begin_tick()
+        if self.latency:
+            self.latency.begin_tick()
+
+        # Iterates through all events (like key presses, mouse clicks) in the event queue.
+        for event in pygame.event.get():
+            # Feeds key events into the input state.
+            self.input_state.process_event(event)
+            if self.latency:
+                self.latency.input(event)
+            # Checks if the user clicked the close button on the window.
+            if event.type == pygame.QUIT or event.type == pygame.WINDOWCLOSE:
+                self.quit()
+
+        # Applies edited map and image files; rebuilds the level when an edit cannot be patched in.
+        if self.hot_reloader:
+            reload_count = self.hot_reloader.reload_count
+            if self.hot_reloader.poll(self.level):
+                self.load_level()
+            elif self.hot_reloader.reload_count != reload_count:
+                # Copies of images made from the old pixels are dropped.
+                if self.texture_renderer:
+                    self.texture_renderer.clear_textures()
+                self.level.visible_sprites.clear_scaled_images()
+
+        if self.texture_renderer:
+            # Simulates this frame, then draws its snapshot with textures and presents it.
+            self.level.update()
+            if self.latency:
+                self.latency.submitted()
+            self.texture_renderer.draw(self.level.snapshot())
+            if self.latency:
+                self.latency.presented()
+        elif self.render_thread:
+            # Simulates this frame, then hands its snapshot to the render thread,
+            # which draws and flips it while the next frame is being simulated.
+            self.level.update()
+            if self.latency:
+                self.latency.submitted()
+            self.render_thread.submit(self.level.snapshot())
+        else:
             # Calls the run method of the level object to update and draw the game state.
             self.level.run()
-            
-            # Checks if the player's health is 0 or less.
-            if self.level.player.health <= 0:
-                # Re-instantiates the Level class, creating a fresh game state.
-                self.level = Level()
-            # -----------------------------
-            
-            # Updates the full display surface to the screen (double buffering).
+            if self.latency:
+                self.latency.submitted()
+            if self.recorder:
+                self.recorder.capture(self.screen)
+
+        # Checks if the player's health is 0 or less.
+        if self.level.player.health <= 0:
+            # Re-instantiates the Level class, creating a fresh game state.
+            self.load_level()
+        # -----------------------------
+
+        # Updates the full display surface to the screen (double buffering).
+        if not self.render_thread and not self.texture_renderer:
             pygame.display.flip()
-            
-            # Pauses the loop to ensure the game runs at the specified frames per second (FPS).
-            self.clock.tick(fps)
+            if self.latency:
+                self.latency.presented()
+
+        # Logs memory gauges at the configured interval.
+        if self.memory_profiler:
+            if pygame.time.get_ticks() - self.last_memory_sample >= memory_sample_interval:
+                print(self.memory_profiler.summary(self.memory_profiler.sample(self.level)))
+                self.last_memory_sample = pygame.time.get_ticks()
+
+        # Adjusts quality to the time this frame's work took (the pacing sleep below is not counted).
+        work_ms = (time.perf_counter() - frame_start) * 1000
+        if self.governor and self.governor.record(work_ms):
+            self.level.apply_quality(self.governor.settings)
+
+        # Collects garbage in the time left before the next frame.
+        if self.gc_controller:
+            self.gc_controller.slack(1000 / fps - work_ms)
+
+        # Pauses the loop to ensure the game runs at the specified frames per second (FPS).
+        self.clock.tick(fps)
+
+    def run(self):
+        # The first frame is the last startup stage.
+        if self.startup_tracer:
+            with trace_stage('first frame'):
+                self.frame()
+            self.finish_startup_trace()
+
+        # Starts the main game loop which runs indefinitely until the user quits.
+        # A crash still shuts down, so threads stop and the garbage collector is handed back.
+        try:
+            while True:
+                self.frame()
+        except Exception:
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        # Stops background work and closes the window, printing a final memory report if profiling.
+        # The garbage collector is restored last, even if an earlier step fails.
+        try:
+            self.stop_services()
+        finally:
+            if self.gc_controller:
+                self.gc_controller.close()
+                self.gc_controller = None
+            # Uninitializes Pygame modules and closes the window.
+            pygame.quit()
+
+    def stop_services(self):
+        # Stops the render thread, texture renderer and recorder, and prints the final reports.
+        if self.render_thread:
+            # Lets the render thread finish its frame before shutting down.
+            self.render_thread.stop()
+            self.render_thread = None
+        if self.recorder:
+            # Flushes the frames still queued for encoding.
+            self.recorder.close()
+            print(self.recorder.report())
+            self.recorder = None
+        if self.texture_renderer:
+            self.texture_renderer.close()
+            self.texture_renderer = None
+        if self.latency:
+            print('\n'.join(self.latency.report()))
+        if system_timing:
+            print('\n'.join(self.level.systems.report()))
+            if self.governor:
+                print('\n'.join(self.governor.report()))
+            if self.gc_controller:
+                print('\n'.join(self.gc_controller.report()))
+        if self.memory_profiler:
+            growth, lines = self.memory_profiler.growth(self.level)
+            print('\n'.join(lines))
+
+    def quit(self):
+        self.shutdown()
+        # Terminates the Python script.
+        sys.exit()
 
 if __name__ == '__main__':
     # Creates an instance of the Game class.
     game = Game()
     # Starts the game loop.
-    game.run()
\ No newline at end of file
+    game.run()
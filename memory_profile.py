@@ -0,0 +1,111 @@
+import gc
+import tracemalloc
+from settings import *
+from support import surface_bytes_by_asset
+
+# Sprite groups on the Level whose sizes are reported as gauges.
+gauge_groups = ('visible_sprites', 'attackable_sprites', 'attack_sprites')
+
+def format_bytes(amount, signed=False):
+    # Formats a byte count for reports, optionally with an explicit '+' for growth.
+    size = abs(amount)
+    text = f'{size / 1048576:.2f} MB' if size >= 1048576 else f'{size / 1024:.1f} KB'
+    if amount < 0:
+        return '-' + text
+    return '+' + text if signed and amount > 0 else text
+
+class MemoryProfiler:
+    def __init__(self, trace_frames=memory_trace_frames):
+        # Number of stack frames kept per traced allocation.
+        self.trace_frames = trace_frames
+        # Baseline (tracemalloc snapshot, sample) that growth is measured against.
+        self.baseline = None
+
+    def start(self):
+        # Starts tracing Python allocations, if nothing else already did.
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+
+    def take_snapshot(self):
+        # Takes a tracemalloc snapshot without the profiler's own bookkeeping.
+        snapshot = tracemalloc.take_snapshot()
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    def sample(self, level):
+        # Records traced memory, sprite-count gauges and Surface bytes by asset.
+        gc.collect()
+        traced, peak = tracemalloc.get_traced_memory()
+        sample = {
+            'traced': traced,
+            'peak': peak,
+            'groups': {name: len(getattr(level, name)) for name in gauge_groups},
+            'surfaces': surface_bytes_by_asset(),
+        }
+        return sample
+
+    def mark_baseline(self, level):
+        # Remembers the current state as the reference point for growth reports.
+        sample = self.sample(level)
+        self.baseline = (self.take_snapshot(), sample)
+        return sample
+
+    def summary(self, sample):
+        # One-line description of a sample, for periodic logging.
+        groups = ' '.join(f'{name}={count}' for name, count in sample['groups'].items())
+        surface_total = sum(sample['surfaces'].values())
+        return (f"memory: traced {format_bytes(sample['traced'])} "
+                f"(peak {format_bytes(sample['peak'])}), "
+                f"surfaces {format_bytes(surface_total)}, {groups}")
+
+    def surface_growth(self, level):
+        # Growth of Surface pixel bytes since the baseline (tracemalloc does not see pixel buffers).
+        if self.baseline is None:
+            self.mark_baseline(level)
+        baseline_total = sum(self.baseline[1]['surfaces'].values())
+        return sum(self.sample(level)['surfaces'].values()) - baseline_total
+
+    def growth(self, level, limit=10):
+        # Compares the current state against the baseline.
+        # Returns (total traced growth in bytes, report lines).
+        if self.baseline is None:
+            self.mark_baseline(level)
+        baseline_snapshot, baseline_sample = self.baseline
+        current = self.sample(level)
+        traced_growth = current['traced'] - baseline_sample['traced']
+
+        lines = ['Memory growth since baseline:']
+        lines.append(f'  traced Python memory: {format_bytes(traced_growth, True)} '
+                     f"(now {format_bytes(current['traced'])}, peak {format_bytes(current['peak'])})")
+
+        lines.append('  sprite groups:')
+        for name, count in current['groups'].items():
+            before = baseline_sample['groups'][name]
+            lines.append(f'    {name}: {before} -> {count} ({count - before:+d})')
+
+        lines.append('  surfaces by asset (changed only):')
+        assets = set(current['surfaces']) | set(baseline_sample['surfaces'])
+        changes = []
+        for asset in assets:
+            difference = current['surfaces'].get(asset, 0) - baseline_sample['surfaces'].get(asset, 0)
+            if difference:
+                changes.append((difference, asset))
+        for difference, asset in sorted(changes, reverse=True)[:limit]:
+            lines.append(f'    {asset}: {format_bytes(difference, True)}')
+        if not changes:
+            lines.append('    (none)')
+
+        lines.append('  top allocation sites:')
+        statistics = self.take_snapshot().compare_to(baseline_snapshot, 'lineno')
+        growing = [stat for stat in statistics if stat.size_diff > 0][:limit]
+        for stat in growing:
+            frame = stat.traceback[0]
+            lines.append(f'    {frame.filename}:{frame.lineno}: {format_bytes(stat.size_diff, True)} '
+                         f'({stat.count_diff:+d} blocks)')
+        if not growing:
+            lines.append('    (none)')
+
+        return traced_growth, lines
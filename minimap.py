@@ -0,0 +1,87 @@
+import pygame
+from settings import *
+from support import import_csv_layout, register_surface
+
+# Map layers shown on the minimap, from the one drawn on top down.
+minimap_layers = ('object', 'grass', 'boundary')
+
+class Minimap:
+    def __init__(self):
+        # Floor layout decides land or water under each cell.
+        self.floor_layout = import_csv_layout('map/map_Floor.csv')
+        rows = len(self.floor_layout)
+        columns = max(len(row) for row in self.floor_layout)
+        self.scale = minimap_tile_size
+
+        # Map layers present in each (column, row) cell; filled in as the level places tiles.
+        # Only the simulation thread touches these two.
+        self.cells = {}
+        # Cells whose pixels are out of date, handed to the next draw by take_changes.
+        self.dirty = set()
+
+        # One block of minimap_tile_size pixels per map tile, painted once here and then patched.
+        self.surface = pygame.Surface((columns * self.scale, rows * self.scale)).convert()
+        register_surface(self.surface, 'minimap')
+        for row_index, row in enumerate(self.floor_layout):
+            for col_index in range(len(row)):
+                self.paint((col_index, row_index), self.cell_color((col_index, row_index)))
+        self.rect = self.surface.get_rect(topright=(width - 10, 10))
+        self.player_color = pygame.Color(minimap_colors['player'])
+        self.enemy_color = pygame.Color(minimap_colors['enemy'])
+
+    def add(self, style, cell):
+        # Records a tile placed on the map; layers not shown on the minimap are ignored.
+        if style in minimap_layers:
+            self.cells.setdefault(cell, set()).add(style)
+            self.dirty.add(cell)
+
+    def remove(self, style, cell):
+        # Records a tile removed from the map (e.g. cut grass).
+        styles = self.cells.get(cell)
+        if styles and style in styles:
+            styles.discard(style)
+            if not styles:
+                del self.cells[cell]
+            self.dirty.add(cell)
+
+    def cell_color(self, cell):
+        # Color of one cell: its top layer, or the floor under it.
+        col_index, row_index = cell
+        styles = self.cells.get(cell, ())
+        for style in minimap_layers:
+            if style in styles:
+                return minimap_colors[style]
+        row = self.floor_layout[row_index] if row_index < len(self.floor_layout) else []
+        on_land = col_index < len(row) and row[col_index].strip() != '-1'
+        return minimap_colors['floor'] if on_land else water_color
+
+    def paint(self, cell, color):
+        # Fills one cell's block of the minimap surface.
+        col_index, row_index = cell
+        self.surface.fill(color, (col_index * self.scale, row_index * self.scale, self.scale, self.scale))
+
+    def take_changes(self):
+        # Called at snapshot time: returns the (cell, color) of every cell changed since the last
+        # call, so the drawing side patches its surface without reading the live cell data.
+        if not self.dirty:
+            return ()
+        changes = tuple((cell, self.cell_color(cell)) for cell in self.dirty)
+        self.dirty = set()
+        return changes
+
+    def draw(self, surface, players, enemies, changes=()):
+        # Repaints only the cells changed since the last frame, then draws the map with one blit
+        # and the markers on top. 'players' and 'enemies' are world positions.
+        for cell, color in changes:
+            self.paint(cell, color)
+        surface.blit(self.surface, self.rect)
+        pygame.draw.rect(surface, ui_border_color, self.rect.inflate(6, 6), 3)
+        for marker, color in self.marker_rects(players, enemies):
+            surface.fill(color, marker)
+
+    def marker_rects(self, players, enemies):
+        # Yields the screen rectangle and color of each marker, players drawn last (on top).
+        for positions, color in ((enemies, self.enemy_color), (players, self.player_color)):
+            for x, y in positions:
+                yield (self.rect.left + x * self.scale // tile_size - 1,
+                       self.rect.top + y * self.scale // tile_size - 1, 3, 3), color
@@ -0,0 +1,81 @@
+import pygame
+import threading
+from collections import namedtuple
+
+# Immutable description of one frame: what to draw and with which camera/UI objects.
+# sprites is a depth-sorted tuple of (image, position, depth) entries in screen space;
+# scaling is the camera's (scale, scene, scaled images) at snapshot time, or None at full scale.
+FrameSnapshot = namedtuple('FrameSnapshot', ['camera', 'ui', 'offset', 'sprites', 'hud', 'scaling'])
+
+# The player values the UI overlay needs, copied out of the Player at snapshot time,
+# plus the minimap markers and the minimap cells changed since the previous snapshot.
+HudState = namedtuple('HudState', ['health', 'max_health', 'energy', 'max_energy', 'exp', 'weapon_index', 'magic_index', 'victory', 'players', 'enemies', 'minimap_changes'])
+
+def draw_frame(surface, frame):
+    # Clears the surface and draws the world and UI described by a snapshot.
+    surface.fill('black')
+    frame.camera.draw_render_list(frame.offset, frame.sprites, frame.scaling)
+    frame.ui.display(frame.hud)
+
+class RenderThread(threading.Thread):
+    def __init__(self, surface, on_drawn=None, on_flipped=None):
+        # Runs as a daemon so a crashed main loop never hangs on exit.
+        super().__init__(name='render', daemon=True)
+        self.surface = surface
+        # Optional callback run with the surface after each frame is drawn, before the flip.
+        self.on_drawn = on_drawn
+        # Optional callback run after each flip, e.g. to timestamp when a frame reached the screen.
+        self.on_flipped = on_flipped
+
+        # Double buffering: the render thread owns the frame it is drawing,
+        # while 'pending' holds the next published frame (the back buffer).
+        self.condition = threading.Condition()
+        self.pending = None
+        self.running = True
+        self.error = None
+
+    def submit(self, frame):
+        # Publishes a frame, waiting while the back buffer is still full so the
+        # simulation never runs more than one frame ahead of the display.
+        with self.condition:
+            while self.pending is not None and self.running:
+                self.condition.wait()
+            if self.error is not None:
+                raise RuntimeError('render thread failed') from self.error
+            self.pending = frame
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            # Takes ownership of the next frame, freeing the back buffer for the simulation.
+            with self.condition:
+                while self.pending is None and self.running:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                frame = self.pending
+                self.pending = None
+                self.condition.notify_all()
+
+            try:
+                # Blits and flip release the GIL, so this overlaps with the next simulation tick.
+                draw_frame(self.surface, frame)
+                if self.on_drawn:
+                    self.on_drawn(self.surface)
+                pygame.display.flip()
+                if self.on_flipped:
+                    self.on_flipped()
+            except Exception as error:
+                with self.condition:
+                    self.error = error
+                    self.running = False
+                    self.condition.notify_all()
+                return
+
+    def stop(self):
+        # Lets the thread finish the frame in flight, then waits for it to exit.
+        with self.condition:
+            self.running = False
+            self.pending = None
+            self.condition.notify_all()
+        self.join()
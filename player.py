@@ -1,14 +1,20 @@
 import pygame
 from settings import *
-from support import import_folder
+from support import load_image
 from entity import Entity
+from animation import *
+from startup_trace import trace_stage
 
 class Player(Entity):
-    def __init__(self, pos, groups, obstacle_sprites, create_attack, destroy_attack, create_magic):
+    # Frames indexed by [state][direction], shared by every player.
+    frame_table = None
+
+    def __init__(self, pos, groups, obstacle_sprites, create_attack, destroy_attack, create_magic, input_state):
         # Initializes the parent Entity class.
         super().__init__(*groups)
+        self.sprite_type = 'player'
         # Loads the default player image.
-        self.image = pygame.image.load('images/player.png').convert_alpha()
+        self.image = load_image('images/player.png')
         self.rect = self.image.get_rect(topleft=pos)
         
         # Uses a vector for precise sub-pixel position tracking.
@@ -23,7 +29,9 @@ class Player(Entity):
 
         # Loads all player animation frames.
         self.import_player_assets()
-        self.status = 'down'
+        # Animation state and facing direction.
+        self.state = idle
+        self.facing = down
                 
         # Movement and attack state variables.
         self.direction = pygame.math.Vector2()
@@ -32,9 +40,13 @@ class Player(Entity):
         self.attack_time = None
         self.obstacle_sprites = obstacle_sprites
 
-        # References to callback functions for creating/destroying weapon attacks.
+        # Per-tick action states fed from keyboard events (or injected in headless runs).
+        self.input_state = input_state
+
+        # References to callback functions for creating/destroying weapon attacks (called with this player).
         self.create_attack = create_attack
         self.destroy_attack = destroy_attack
+        self.current_attack = None
         self.weapon_index = 1
         self.weapon = list(weapons_data.keys())[self.weapon_index]
 
@@ -61,93 +73,77 @@ class Player(Entity):
 
 
     def import_player_assets(self):
-        # Defines the base path for player graphics.
-        character_path = 'graphics/player/'
-        # Dictionary keys correspond to folder names for each animation state.
-        self.animations = {'up': [], 'down': [], 'left': [], 'right': [], 'right_idle': [], 'left_idle': [], 'up_idle': [], 'down_idle': [], 'right_attack': [], 'left_attack': [], 'up_attack': [], 'down_attack': []}
-        
-        # Iterates through keys and imports images from the corresponding folder.
-        for animation in self.animations.keys():
-            full_path = character_path + animation
-            self.animations[animation] = import_folder(full_path)
-        
-    def get_status(self):
-        # Determines the current status string (e.g., 'left_idle', 'up_attack') based on movement and action.
-        
-        # If the player is not moving, set status to idle.
-        if self.direction.x == 0 and self.direction.y == 0:
-            if not 'idle' in self.status and not 'attack' in self.status:
-                self.status = self.status + '_idle'
+        # Loads the frames of every (state, direction) pair from folders named like 'down_idle', once per game.
+        if Player.frame_table is None:
+            with trace_stage('import_player_assets'):
+                Player.frame_table = load_frame_table('graphics/player/', player_status_names)
+        self.frames = Player.frame_table
 
-        # If attacking, movement is locked and status is set to attack.
+    @property
+    def status(self):
+        # Status name of the current state and direction (e.g. 'left_idle'), for replication.
+        return player_status_names[self.state][self.facing]
+
+    def get_status(self):
+        # Picks the animation state: attacking locks movement, otherwise moving or idle.
         if self.attacking:
             self.direction.x = 0
             self.direction.y = 0
-            if not 'attack' in self.status:
-                if 'idle' in self.status:
-                    self.status = self.status.replace('_idle', '_attack')
-                else:
-                    self.status = self.status + '_attack'
-        else:
-            # If not attacking, remove '_attack' suffix.
-            if 'attack' in self.status:
-                self.status = self.status.replace('_attack', '')
+        self.state = transitions[self.attacking][self.direction.x != 0 or self.direction.y != 0]
 
     def input(self):
-        # Handles keyboard input.
+        # Handles the actions recorded by the input state for this tick.
         if not self.attacking:
-            keys = pygame.key.get_pressed()
+            actions = self.input_state
 
             # Vertical movement
-            if keys[pygame.K_w]:
+            if actions.is_held('up'):
                 self.direction.y = -1
-                self.status = 'up'
-            elif keys[pygame.K_s]:
+                self.facing = up
+            elif actions.is_held('down'):
                 self.direction.y = 1
-                self.status = 'down'
+                self.facing = down
             else:
                 self.direction.y = 0
 
             # Horizontal movement
-            if keys[pygame.K_a]:
+            if actions.is_held('left'):
                 self.direction.x = -1
-                self.status = 'left'
-            elif keys[pygame.K_d]:
+                self.facing = left
+            elif actions.is_held('right'):
                 self.direction.x = 1
-                self.status = 'right'
+                self.facing = right
             else:
                 self.direction.x = 0
 
-            # Attack input (Spacebar)
-            if keys[pygame.K_SPACE]:
+            # Attack input, also catching taps released within the same tick.
+            if actions.is_held('attack') or actions.was_pressed('attack'):
                 self.attacking = True
                 self.attack_time = pygame.time.get_ticks()
-                self.create_attack()
+                self.create_attack(self)
         
-            # Magic input (Left Control)
-            if keys[pygame.K_LCTRL]:
+            # Magic input
+            if actions.is_held('magic') or actions.was_pressed('magic'):
                 self.attacking = True
                 self.attack_time = pygame.time.get_ticks()
                 style = list(magic_data.keys())[self.magic_index]
                 strength = list(magic_data.values())[self.magic_index]['strength'] + self.stats['magic']
                 cost = list(magic_data.values())[self.magic_index]['cost']
-                self.create_magic(style, strength, cost)
+                self.create_magic(self, style, strength, cost)
 
-            # Switch magic input (E)
-            if keys[pygame.K_e]:
+            # Switch magic input, once per key press.
+            if actions.was_pressed('switch_magic'):
                 self.magic_index += 1
                 if self.magic_index >= len(magic_data):
                     self.magic_index = 0
                 self.magic = list(magic_data.keys())[self.magic_index]
-                pygame.time.delay(200)  # Simple debounce
             
-            # Switch weapon input (Q)
-            if keys[pygame.K_q]:
+            # Switch weapon input, once per key press.
+            if actions.was_pressed('switch_weapon'):
                 self.weapon_index += 1
                 if self.weapon_index >= len(weapons_data):
                     self.weapon_index = 0
                 self.weapon = list(weapons_data.keys())[self.weapon_index]
-                pygame.time.delay(200)  # Simple debounce
      
     def get_full_weapon_damage(self):
         # Calculates total damage = base attack + weapon damage.
@@ -193,7 +189,7 @@ class Player(Entity):
             # End attack state if cooldown has passed.
             if current_time - self.attack_time >= self.attack_cooldown:
                 self.attacking = False
-                self.destroy_attack()
+                self.destroy_attack(self)
         
         if not self.vulnerable:
             # End invulnerability if duration has passed.
@@ -201,20 +197,16 @@ class Player(Entity):
                 self.vulnerable = True
 
     def animate(self):
-        # Cycles through frames of the current animation status.
-        animation = self.animations[self.status]
+        # Cycles through the frames of the current state and direction.
+        animation = self.frames[self.state][self.facing]
         self.frame_index += self.animation_speed
         if self.frame_index >= len(animation):
             self.frame_index = 0
         self.image = animation[int(self.frame_index)]
         self.rect = self.image.get_rect(midbottom=self.hitbox.midbottom)
 
-    def update(self):
-        # Main update loop for the player.
-        self.input()
+    def movement(self):
+        # Advances timers, picks the animation state and moves.
         self.cooldowns()
         self.get_status()
-        self.animate()
         self.move(self.speed)
-        self.check_level_up()
-        self.check_death()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import struct
+from settings import *
+
+# Every message is framed as: u16 payload length, u8 message type, payload.
+frame_header = struct.Struct('<HB')
+message_hello = 1
+message_input = 2
+message_snapshot = 3
+
+# hello: u32 entity ID of the client's player, u16 server tick rate.
+# Entity IDs are never reused and grow with every spawn, so they are sent in full as u32.
+hello_format = struct.Struct('<IH')
+# input: u32 client tick, u8 held action bits, u8 pressed action bits.
+input_format = struct.Struct('<IBB')
+# snapshot header: u32 tick, u16 changed entity count, u16 removed entity count.
+snapshot_header = struct.Struct('<IHH')
+# Each changed entity starts with u32 ID and a u8 mask of the fields that follow.
+entity_header = struct.Struct('<IB')
+removed_format = struct.Struct('<I')
+
+# Actions sent as bits in input messages, in bit order.
+input_actions = ('up', 'down', 'left', 'right', 'attack', 'magic', 'switch_magic', 'switch_weapon')
+
+# Entity kinds and statuses are sent as small integer codes.
+entity_kinds = ('player',) + tuple(monster_data)
+entity_statuses = (
+    'up', 'down', 'left', 'right',
+    'up_idle', 'down_idle', 'left_idle', 'right_idle',
+    'up_attack', 'down_attack', 'left_attack', 'right_attack',
+    'idle', 'move', 'attack')
+status_codes = {status: code for code, status in enumerate(entity_statuses)}
+
+# Delta fields: bit, name and struct format, in the order they are written.
+entity_fields = (
+    (1, 'kind', struct.Struct('<B')),
+    (2, 'x', struct.Struct('<h')),
+    (4, 'y', struct.Struct('<h')),
+    (8, 'status', struct.Struct('<B')),
+    (16, 'health', struct.Struct('<H')),
+)
+
+def frame_message(message_type, payload):
+    # Prefixes a payload with its length and type.
+    return frame_header.pack(len(payload), message_type) + payload
+
+def read_messages(buffer):
+    # Splits complete messages off the front of a receive buffer.
+    # Returns ([(type, payload)], remaining bytes).
+    messages = []
+    while len(buffer) >= frame_header.size:
+        length, message_type = frame_header.unpack_from(buffer)
+        end = frame_header.size + length
+        if len(buffer) < end:
+            break
+        messages.append((message_type, bytes(buffer[frame_header.size:end])))
+        buffer = buffer[end:]
+    return messages, buffer
+
+def encode_actions(actions):
+    # Packs a set of action names into a bit field.
+    bits = 0
+    for bit, action in enumerate(input_actions):
+        if action in actions:
+            bits |= 1 << bit
+    return bits
+
+def decode_actions(bits):
+    return {action for bit, action in enumerate(input_actions) if bits & (1 << bit)}
+
+def entity_state(sprite):
+    # Quantizes the replicated state of a player or enemy: the hitbox position
+    # rounded to network_position_step pixels, the status code and whole health points.
+    kind = 0 if sprite.sprite_type == 'player' else entity_kinds.index(sprite.monster_name)
+    step = network_position_step
+    return {
+        'kind': kind,
+        'x': int(round(sprite.hitbox.centerx / step)) * step,
+        'y': int(round(sprite.hitbox.centery / step)) * step,
+        'status': status_codes[sprite.status],
+        'health': max(0, int(sprite.health)),
+    }
+
+def encode_snapshot(tick, known, current):
+    # Builds a delta snapshot from the states the client already has ('known')
+    # to 'current' (both dicts of entity ID -> state), sending changed fields only.
+    changed = []
+    for entity_id, state in current.items():
+        previous = known.get(entity_id)
+        mask = 0
+        data = []
+        for bit, name, field in entity_fields:
+            if previous is None or previous[name] != state[name]:
+                mask |= bit
+                data.append(field.pack(state[name]))
+        if mask:
+            changed.append(entity_header.pack(entity_id, mask) + b''.join(data))
+    removed = [removed_format.pack(entity_id) for entity_id in known if entity_id not in current]
+    payload = snapshot_header.pack(tick, len(changed), len(removed)) + b''.join(changed) + b''.join(removed)
+    return frame_message(message_snapshot, payload)
+
+def apply_snapshot(world, payload):
+    # Applies a delta snapshot to a client's dict of entity ID -> state. Returns the server tick.
+    tick, changed_count, removed_count = snapshot_header.unpack_from(payload)
+    offset = snapshot_header.size
+    for _ in range(changed_count):
+        entity_id, mask = entity_header.unpack_from(payload, offset)
+        offset += entity_header.size
+        state = world.setdefault(entity_id, {})
+        for bit, name, field in entity_fields:
+            if mask & bit:
+                state[name] = field.unpack_from(payload, offset)[0]
+                offset += field.size
+    for _ in range(removed_count):
+        entity_id = removed_format.unpack_from(payload, offset)[0]
+        offset += removed_format.size
+        world.pop(entity_id, None)
+    return tick
+
+def check_round_trip():
+    # Encodes a sequence of snapshots and applies them on a client copy, checking the client
+    # ends up with exactly the server's states (IDs above the u16 range included).
+    states = [
+        {1: {'kind': 0, 'x': 100, 'y': -40, 'status': 5, 'health': 100},
+         70000: {'kind': 2, 'x': 3000, 'y': 2000, 'status': 12, 'health': 80}},
+        {1: {'kind': 0, 'x': 104, 'y': -40, 'status': 0, 'health': 95},
+         70000: {'kind': 2, 'x': 3000, 'y': 2000, 'status': 12, 'health': 80},
+         4294967295: {'kind': 1, 'x': -32768, 'y': 32767, 'status': 14, 'health': 65535}},
+        {4294967295: {'kind': 1, 'x': -32760, 'y': 32767, 'status': 13, 'health': 0}},
+        {},
+    ]
+    known = {}
+    world = {}
+    for tick, current in enumerate(states):
+        messages, remaining = read_messages(encode_snapshot(tick, known, current))
+        assert remaining == b'' and len(messages) == 1 and messages[0][0] == message_snapshot
+        assert apply_snapshot(world, messages[0][1]) == tick
+        assert world == current, (tick, world, current)
+        known = current
+    # The hello message carries the full ID as well.
+    assert hello_format.unpack(hello_format.pack(70000, 60)) == (70000, 60)
+
+if __name__ == '__main__':
+    # Checks the wire format: python protocol.py
+    check_round_trip()
+    print('protocol round trip OK')
@@ -0,0 +1,54 @@
+from settings import *
+
+class QualityGovernor:
+    def __init__(self, levels=quality_levels, budget_ms=1000 / fps):
+        # Quality levels from best (0) to cheapest, and the frame time they have to fit in.
+        self.levels = levels
+        self.budget_ms = budget_ms
+        self.level = 0
+        # Exponential moving average of frame work time, in milliseconds.
+        self.average_ms = 0.0
+        # Consecutive frames spent over (or comfortably under) budget, for hysteresis.
+        self.over = 0
+        self.under = 0
+        # Telemetry: frames spent at each level and how many times the level changed.
+        self.frames_at = [0] * len(levels)
+        self.changes = 0
+
+    @property
+    def settings(self):
+        # Settings of the current level.
+        return self.levels[self.level]
+
+    def record(self, frame_ms):
+        # Adds one frame's work time. Returns True when the quality level changed.
+        # Steps down quickly after a run of slow frames, and back up only after a much longer
+        # run of fast ones, so the level does not flap around the threshold.
+        self.average_ms += (frame_ms - self.average_ms) * governor_smoothing
+        self.frames_at[self.level] += 1
+
+        if self.average_ms > self.budget_ms * governor_high:
+            self.over += 1
+            self.under = 0
+        elif self.average_ms < self.budget_ms * governor_low:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= governor_down_frames and self.level < len(self.levels) - 1:
+            return self.set_level(self.level + 1)
+        if self.under >= governor_up_frames and self.level > 0:
+            return self.set_level(self.level - 1)
+        return False
+
+    def set_level(self, level):
+        self.level = level
+        self.over = self.under = 0
+        self.changes += 1
+        return True
+
+    def report(self):
+        total = max(1, sum(self.frames_at))
+        shares = ', '.join(f'{index}: {count * 100 / total:.0f}%' for index, count in enumerate(self.frames_at))
+        return [f'quality: level {self.level}, {self.changes} changes, average frame {self.average_ms:.2f} ms, time at each level {shares}']
@@ -0,0 +1,246 @@
+import argparse
+import os
+import selectors
+import socket
+import time
+import pygame
+from settings import *
+from controls import InputState
+from level import Level
+from protocol import *
+
+class ClientConnection:
+    def __init__(self, sock, address, player):
+        self.sock = sock
+        self.address = address
+        self.player = player
+        self.receive_buffer = b''
+        self.send_buffer = b''
+        # Last state sent for each entity; TCP delivers in order, so this is the client's baseline.
+        self.known = {}
+        self.bytes_sent = 0
+        self.snapshots_sent = 0
+        # Consecutive ticks the client's previous data was still unsent.
+        self.backlog_ticks = 0
+
+class GameServer:
+    def __init__(self, host=server_host, port=server_port, tick_rate=server_tick_rate):
+        # Runs the Level headless: dummy video driver, nothing is ever drawn.
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        pygame.init()
+        pygame.display.set_mode((width, height))
+        self.level = Level()
+        # Enemies chase the map's player until a client takes control of it.
+        self.level.player.input_state = InputState()
+
+        self.tick_rate = tick_rate
+        self.tick = 0
+        # Tick cost statistics, in seconds.
+        self.tick_time_total = 0.0
+        self.tick_time_max = 0.0
+
+        # Non-blocking listening socket; accepts and reads are multiplexed with a selector.
+        self.selector = selectors.DefaultSelector()
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.clients = []
+
+    def accept(self):
+        sock, address = self.listener.accept()
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # The first client takes over the map's player; later ones get a new player.
+        if not any(client.player is self.level.player for client in self.clients):
+            player = self.level.player
+            player.input_state = InputState()
+        else:
+            player = self.level.add_player(InputState())
+        client = ClientConnection(sock, address, player)
+        self.clients.append(client)
+        self.selector.register(sock, selectors.EVENT_READ, client)
+        client.send_buffer += frame_message(message_hello, hello_format.pack(player.entity_id, self.tick_rate))
+
+    def disconnect(self, client):
+        self.selector.unregister(client.sock)
+        client.sock.close()
+        self.clients.remove(client)
+        if client.player is self.level.player:
+            # The map's player stays in the level, idle.
+            client.player.input_state = InputState()
+        else:
+            self.level.remove_player(client.player)
+
+    def receive(self, client):
+        try:
+            data = client.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.disconnect(client)
+            return
+        messages, client.receive_buffer = read_messages(client.receive_buffer + data)
+        for message_type, payload in messages:
+            if message_type == message_input:
+                self.apply_input(client, payload)
+
+    def apply_input(self, client, payload):
+        # Turns the client's action bits into presses and releases on its player's input state.
+        client_tick, held_bits, pressed_bits = input_format.unpack(payload)
+        held = decode_actions(held_bits)
+        pressed = decode_actions(pressed_bits)
+        input_state = client.player.input_state
+        for action in input_actions:
+            if action in pressed and not input_state.is_held(action):
+                input_state.press(action)
+                # A tap that went down and up between two input messages.
+                if action not in held:
+                    input_state.release(action)
+            elif action in held and not input_state.is_held(action):
+                input_state.press(action)
+            elif action not in held and input_state.is_held(action):
+                input_state.release(action)
+
+    def poll(self, timeout):
+        # Accepts connections and reads input until the timeout.
+        for key, events in self.selector.select(timeout):
+            if key.data is None:
+                self.accept()
+            else:
+                self.receive(key.data)
+
+    def visible_states(self, client):
+        # Quantized states of the players and enemies within the client's interest radius.
+        center = pygame.math.Vector2(client.player.hitbox.center)
+        states = {}
+        entities = self.level.players + [s for s in self.level.attackable_sprites if s.sprite_type == 'enemy']
+        for sprite in entities:
+            if sprite.alive() and center.distance_to(sprite.hitbox.center) <= server_interest_radius:
+                states[sprite.entity_id] = entity_state(sprite)
+        return states
+
+    def send_snapshots(self):
+        for client in list(self.clients):
+            # A client still holding unsent data is skipped instead of queuing more. 'known' only
+            # advances when a snapshot is queued, so its next delta covers everything it missed.
+            if client.send_buffer:
+                self.flush(client)
+                if client not in self.clients:
+                    continue
+                if client.send_buffer:
+                    client.backlog_ticks += 1
+                    if client.backlog_ticks > server_backlog_ticks or len(client.send_buffer) > server_send_buffer_limit:
+                        print(f'server: dropping slow client {client.address}')
+                        self.disconnect(client)
+                    continue
+            client.backlog_ticks = 0
+            current = self.visible_states(client)
+            message = encode_snapshot(self.tick, client.known, current)
+            client.known = current
+            client.send_buffer += message
+            client.bytes_sent += len(message)
+            client.snapshots_sent += 1
+            self.flush(client)
+
+    def flush(self, client):
+        try:
+            sent = client.sock.send(client.send_buffer)
+            client.send_buffer = client.send_buffer[sent:]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self.disconnect(client)
+
+    def step(self):
+        # One fixed server tick: apply inputs, simulate, respawn, replicate.
+        start = time.perf_counter()
+        self.poll(0)
+        self.level.update()
+        # Press and release edges are cleared only once a tick has consumed them; input read
+        # in the slack time between ticks lands in the next tick.
+        for client in self.clients:
+            client.player.input_state.begin_tick()
+        for player in self.level.players:
+            if player.health <= 0:
+                self.level.respawn_player(player)
+        self.tick += 1
+        self.send_snapshots()
+        tick_time = time.perf_counter() - start
+        self.tick_time_total += tick_time
+        self.tick_time_max = max(self.tick_time_max, tick_time)
+
+    def run(self, duration=None):
+        # Ticks at the fixed rate, waiting for network input in the slack time.
+        interval = 1 / self.tick_rate
+        next_tick = time.perf_counter()
+        end = None if duration is None else next_tick + duration
+        while end is None or next_tick < end:
+            self.step()
+            next_tick += interval
+            remaining = next_tick - time.perf_counter()
+            if remaining > 0:
+                self.poll(remaining)
+            else:
+                # Fell behind; skip ahead instead of bursting to catch up.
+                next_tick = time.perf_counter()
+
+    def stats(self):
+        # Summarizes tick cost and bandwidth per client.
+        average = self.tick_time_total / max(1, self.tick)
+        lines = [f'server: {self.tick} ticks, tick cost avg {average * 1000:.3f} ms, '
+                 f'max {self.tick_time_max * 1000:.3f} ms, {len(self.level.players)} players, '
+                 f"{len([s for s in self.level.attackable_sprites if s.sprite_type == 'enemy'])} enemies"]
+        for client in self.clients:
+            per_tick = client.bytes_sent / max(1, client.snapshots_sent)
+            lines.append(f'  client {client.address}: {per_tick:.1f} bytes/tick, '
+                         f'{per_tick * self.tick_rate / 1024:.2f} KB/s')
+        return lines
+
+    def close(self):
+        for client in list(self.clients):
+            self.disconnect(client)
+        self.selector.close()
+        self.listener.close()
+        pygame.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the authoritative game server.')
+    parser.add_argument('--host', default=server_host)
+    parser.add_argument('--port', type=int, default=server_port)
+    parser.add_argument('--bench', action='store_true', help='run local bot clients and report tick cost and bandwidth')
+    parser.add_argument('--clients', type=int, default=4, help='number of bot clients in bench mode')
+    parser.add_argument('--enemies', type=int, default=0, help='extra enemies to spawn in bench mode')
+    parser.add_argument('--seconds', type=float, default=10, help='bench duration')
+    args = parser.parse_args()
+
+    if not args.bench:
+        server = GameServer(args.host, args.port)
+        print(f'Listening on {server.address[0]}:{server.address[1]}')
+        try:
+            server.run()
+        finally:
+            server.close()
+        return
+
+    # Bench: server and bots in one process, over localhost.
+    from client import run_bots
+    server = GameServer(args.host, 0)
+    spawn_points = server.level.spawn_points
+    for index in range(args.enemies):
+        server.level.enemy_pool.acquire(list(monster_data)[index % len(monster_data)], spawn_points[index % len(spawn_points)])
+    bots = run_bots(server.address, args.clients, args.seconds)
+    server.run(args.seconds)
+    print('\n'.join(server.stats()))
+    for bot in bots:
+        bot.join()
+        if bot.client:
+            print(f'  bot: {bot.client.snapshots} snapshots, {len(bot.client.world)} entities in view')
+    server.close()
+
+if __name__ == '__main__':
+    main()
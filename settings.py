@@ -4,9 +4,156 @@ width = 1280
 height = 720
 # Defines the target frames per second for the game loop.
 fps = 60
+# Draws each frame on a separate render thread while the next frame is simulated.
+pipelined_rendering = False
+# Enables memory instrumentation: tracemalloc tracing plus periodic sprite and Surface gauges.
+memory_profiling = False
+# Sets how often (in milliseconds) memory gauges are sampled and logged while profiling.
+memory_sample_interval = 10000
+# Sets how many stack frames tracemalloc records per allocation.
+memory_trace_frames = 1
+# Path of the prebuilt asset bundle (built with 'python bundle.py'); PNG files are loaded when it is missing.
+asset_bundle_path = 'assets.bundle'
+# Folders whose images are packed into the asset bundle.
+asset_bundle_roots = ('graphics', 'images')
+# Pre-builds this many enemies of each monster type for the enemy pool.
+enemy_pool_size = 8
+# Keeps re-populating the map with waves of enemies from the pool.
+wave_spawning = False
+# Sets the time (in milliseconds) between enemy waves.
+wave_interval = 20000
+# Sets how many enemies a single wave may spawn.
+wave_size = 6
+# Caps the number of live enemies; waves stop spawning at this count.
+wave_max_enemies = 40
+# Keeps wave spawns at least this many pixels away from the player.
+wave_min_player_distance = 400
+# Records gameplay frames to disk, encoding them on background threads.
+capture_enabled = False
+# Sets the folder recorded frames are written to.
+capture_path = 'captures'
+# Selects the capture output: 'png' writes a numbered PNG sequence, 'raw' writes one raw video stream.
+capture_format = 'png'
+# Sets how many preallocated frame buffers the capture ring holds; frames are dropped when all are busy.
+capture_buffers = 8
+# Sets how many background threads encode PNG frames.
+capture_workers = 2
+# Sets the address the game server listens on.
+server_host = '127.0.0.1'
+server_port = 7777
+# Sets how many simulation ticks per second the server runs.
+server_tick_rate = 30
+# A client that has not taken its queued snapshot gets no new ones; it is dropped after this many
+# ticks of backlog, or as soon as its unsent data exceeds server_send_buffer_limit bytes.
+server_backlog_ticks = 60
+server_send_buffer_limit = 262144
+# Only entities within this many pixels of a client's player are sent to that client.
+server_interest_radius = 900
+# Rounds replicated positions to multiples of this many pixels.
+network_position_step = 2
+# Sets the time budget (in milliseconds) per frame for enemy AI decisions; urgent enemies always decide.
+ai_budget_ms = 2.0
+# Caps how many cached line-of-sight results are kept before the cache is reset.
+los_cache_limit = 4096
+# Run-length encodes transparent images when they are converted, which speeds up their blits.
+surface_rle = True
+# Color used as the transparent key for images that are fully opaque or fully transparent per pixel.
+surface_colorkey = (255, 0, 255)
+# Prints the pixel format of every Surface in use once the level is loaded (debugging aid).
+surface_audit = False
+# Selects how frames are drawn: 'surface' (software blits onto the display surface) or 'texture'
+# (images uploaded once as SDL textures and drawn by an SDL renderer). The texture backend draws on
+# the main thread, so it ignores pipelined_rendering, and frame capture is not supported with it.
+render_backend = 'surface'
+# Renderer type for the texture backend: -1 lets SDL choose, 0 forces the software renderer (no GPU needed), 1 requires hardware.
+texture_accelerated = -1
+# Measures input-to-display latency and prints histograms on exit.
+latency_tracking = False
+# Width in milliseconds of each latency histogram bucket, and the number of buckets (the last one is open-ended).
+latency_bucket_ms = 4
+latency_buckets = 25
+# Number of tiles a flame reaches in front of the caster.
+flame_length = 5
+# Names of level systems to switch off (e.g. ('ai', 'particles') when profiling); see Level.systems.
+disabled_systems = ()
+# Prints the average and worst cost of each level system on exit.
+system_timing = False
+# Fraction of the window resolution the world is drawn at with the surface backend (e.g. 0.5 draws at 640x360
+# and scales up); the UI always stays at full resolution. Lower values trade sharpness for frame rate.
+render_scale = 1.0
+# Lowers quality step by step when frames take too long, and restores it when there is headroom again.
+quality_governor = True
+# Quality levels from best to cheapest:
+# particles: share of particles spawned by bursts (grass leaves, flames)
+# offscreen_animation: off-screen enemies animate once every this many frames
+# render_scale: internal resolution of the world (see render_scale)
+# ai_budget_ms: time per frame for non-urgent (distant) enemy decisions
+quality_levels = [
+    {'particles': 1.0, 'offscreen_animation': 1, 'render_scale': render_scale, 'ai_budget_ms': ai_budget_ms},
+    {'particles': 0.5, 'offscreen_animation': 2, 'render_scale': render_scale, 'ai_budget_ms': ai_budget_ms / 2},
+    {'particles': 0.5, 'offscreen_animation': 4, 'render_scale': min(render_scale, 0.75), 'ai_budget_ms': ai_budget_ms / 4},
+    {'particles': 0.25, 'offscreen_animation': 8, 'render_scale': min(render_scale, 0.5), 'ai_budget_ms': ai_budget_ms / 8}
+]
+# Smoothing factor of the frame time moving average (higher reacts faster).
+governor_smoothing = 0.1
+# Shares of the frame budget above which quality goes down, and below which it may go back up.
+governor_high = 0.9
+governor_low = 0.6
+# Consecutive frames over budget before stepping down, and under it before stepping up.
+governor_down_frames = 30
+governor_up_frames = 300
+# Controls garbage collection: counts pauses per generation and collects between frames.
+# This changes the whole process, not just the game: gc.disable() (with gc_slack_collection) and
+# gc.freeze() (with gc_freeze_after_load) apply to every module until the Game shuts down,
+# so it is off by default and meant for the game client, not the server or tools importing Game.
+gc_control = False
+# Freezes everything alive after a level loads, so collections stop rescanning the static world.
+gc_freeze_after_load = True
+# Turns off automatic collections and runs the due ones in the slack time after each frame's work.
+gc_slack_collection = True
+# Slack (milliseconds) a frame must have left for a due collection to run in it.
+gc_min_slack_ms = 2.0
+# Without enough slack, collections wait until garbage reaches this many times the normal threshold.
+gc_force_factor = 10
+# Records a timeline of the startup stages (with files and bytes read) as a Chrome trace-event JSON file.
+startup_tracing = False
+# Sets the file the startup timeline is written to (open it in chrome://tracing or ui.perfetto.dev).
+startup_trace_path = 'startup_trace.json'
+# Watches map CSVs and images while the game runs and applies edits without a restart (development mode).
+hot_reload = False
+# Sets how often (in milliseconds) watched files are checked for changes.
+hot_reload_interval = 500
 # Defines the standard size (width and height) of a single tile in the grid.
 tile_size = 64
 
+# Selects how the floor is built: 'image' cuts ground.png into chunks, 'csv' builds them from map_Floor.csv and the Floor tileset.
+floor_source = 'image'
+# Sets the width and height (in pixels) of each cached floor chunk.
+floor_chunk_size = 512
+# Caps how many floor chunks are kept in memory when they can be rebuilt cheaply (CSV floor, or the
+# image floor served from the asset bundle); the image floor without a bundle keeps every chunk.
+floor_chunk_cache_size = 24
+
+# Maps each game action to the names of the keys that trigger it (names as accepted by pygame.key.key_code).
+key_bindings = {
+    'up': ['w'],
+    'down': ['s'],
+    'left': ['a'],
+    'right': ['d'],
+    'attack': ['space'],
+    'magic': ['left ctrl'],
+    'switch_magic': ['e'],
+    'switch_weapon': ['q']
+}
+
+# Map layers loaded by the level, and the CSV file each comes from.
+map_layers = {
+    'boundary': 'map/map_FloorBlocks.csv',
+    'grass': 'map/map_Grass.csv',
+    'object': 'map/map_Objects.csv',
+    'entities': 'map/map_Entities.csv'
+}
+
 # Sets the height for UI bars (health and energy).
 bar_height = 20
 # Sets the width of the player's health bar.
@@ -29,6 +176,20 @@ ui_border_color = '#111111'
 # Defines the color for standard text.
 text_color = '#eeeeee'
 
+# Draws the minimap overlay in the top right corner.
+minimap_enabled = True
+# Sets the size in pixels of one map tile on the minimap.
+minimap_tile_size = 3
+# Colors of the minimap's tiles and markers.
+minimap_colors = {
+    'floor': '#6a9a4c',
+    'boundary': '#3e5a32',
+    'grass': '#2f7a2a',
+    'object': '#5c4a3a',
+    'player': 'white',
+    'enemy': 'red'
+}
+
 # Defines the color of the health bar.
 health_color = 'red'
 # Defines the color of the energy bar.
@@ -0,0 +1,104 @@
+import argparse
+import random
+import sys
+import time
+import pygame
+from settings import *
+from main import Game
+from memory_profile import MemoryProfiler, format_bytes
+
+class ScriptedPlayer:
+    def __init__(self, bindings, seed=0):
+        # Posts real key events, so scripted play goes through the normal input path.
+        self.keys = {action: pygame.key.key_code(names[0]) for action, names in bindings.items()}
+        self.random = random.Random(seed)
+        self.held = set()
+        self.ticks_left = 0
+
+    def post(self, event_type, action):
+        # Stamps each event with its creation time, so latency tracking covers time spent queued.
+        pygame.event.post(pygame.event.Event(event_type, key=self.keys[action], input_time=time.perf_counter()))
+
+    def set_held(self, actions):
+        # Releases and presses keys so exactly the given actions are held.
+        for action in self.held - actions:
+            self.post(pygame.KEYUP, action)
+        for action in actions - self.held:
+            self.post(pygame.KEYDOWN, action)
+        self.held = set(actions)
+
+    def tap(self, action):
+        self.post(pygame.KEYDOWN, action)
+        self.post(pygame.KEYUP, action)
+
+    def step(self):
+        # Every so often picks a new direction and a mix of attacks, spells and switches.
+        self.ticks_left -= 1
+        if self.ticks_left > 0:
+            return
+        self.ticks_left = self.random.randint(20, 90)
+
+        actions = set()
+        vertical = self.random.choice((None, 'up', 'down'))
+        horizontal = self.random.choice((None, 'left', 'right'))
+        actions.update(action for action in (vertical, horizontal) if action)
+        if self.random.random() < 0.5:
+            actions.add('attack')
+        self.set_held(actions)
+
+        if self.random.random() < 0.3:
+            self.tap('magic')
+        if self.random.random() < 0.1:
+            self.tap('switch_magic')
+        if self.random.random() < 0.1:
+            self.tap('switch_weapon')
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs scripted headless play and reports memory growth.')
+    parser.add_argument('--minutes', type=float, default=10, help='how long to play after warmup')
+    parser.add_argument('--warmup', type=float, default=30, help='seconds of play before the baseline is taken')
+    parser.add_argument('--interval', type=float, default=60, help='seconds between progress samples')
+    parser.add_argument('--max-growth', type=float, default=4, help='traced growth (MB) that counts as a leak')
+    # The default leaves room for the floor chunk cache filling up (24 chunks of 512 px, about 22 MB).
+    parser.add_argument('--max-surface-growth', type=float, default=24, help='Surface pixel growth (MB) that counts as a leak')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the scripted input')
+    args = parser.parse_args()
+
+    # Tracing starts before the game is created so level loading is covered too.
+    profiler = MemoryProfiler()
+    profiler.start()
+
+    game = Game(headless=True)
+    player = ScriptedPlayer(key_bindings, args.seed)
+
+    def play(seconds, on_interval=None):
+        # Runs scripted frames in real time, so cooldowns and timers behave as in normal play.
+        end = pygame.time.get_ticks() + seconds * 1000
+        next_sample = pygame.time.get_ticks() + args.interval * 1000
+        while pygame.time.get_ticks() < end:
+            player.step()
+            game.frame()
+            if on_interval and pygame.time.get_ticks() >= next_sample:
+                on_interval()
+                next_sample += args.interval * 1000
+
+    play(args.warmup)
+    print(profiler.summary(profiler.mark_baseline(game.level)))
+    play(args.minutes * 60, lambda: print(profiler.summary(profiler.sample(game.level))))
+
+    growth, lines = profiler.growth(game.level)
+    surface_growth = profiler.surface_growth(game.level)
+    print('\n'.join(lines))
+    game.shutdown()
+
+    # A non-zero exit status makes leaks fail CI runs instead of surfacing as OOM kills later.
+    # Surface pixels live outside the Python heap, so they have their own limit.
+    result = (f'traced memory grew {format_bytes(growth, True)} (limit {args.max_growth} MB), '
+              f'surfaces grew {format_bytes(surface_growth, True)} (limit {args.max_surface_growth} MB)')
+    if growth > args.max_growth * 1048576 or surface_growth > args.max_surface_growth * 1048576:
+        print(f'FAIL: {result}')
+        sys.exit(1)
+    print(f'OK: {result}')
+
+if __name__ == '__main__':
+    main()
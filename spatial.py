@@ -0,0 +1,68 @@
+import pygame
+from settings import *
+
+class SpatialIndex:
+    def __init__(self, cell_size=tile_size):
+        # Sprites filed under every (column, row) cell their hitbox overlaps.
+        self.cell_size = cell_size
+        self.cells = {}
+        # Cell range (first column, first row, last column, last row) each sprite is filed under.
+        self.ranges = {}
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def add(self, sprite):
+        cell_range = self.ranges[sprite] = self.cell_range(sprite.hitbox)
+        first_col, first_row, last_col, last_row = cell_range
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                self.cells.setdefault((col, row), set()).add(sprite)
+
+    def remove(self, sprite):
+        cell_range = self.ranges.pop(sprite, None)
+        if cell_range is None:
+            return
+        first_col, first_row, last_col, last_row = cell_range
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = self.cells.get((col, row))
+                if cell is not None:
+                    cell.discard(sprite)
+                    if not cell:
+                        del self.cells[(col, row)]
+
+    def move(self, sprite):
+        # Refiles a moving sprite; does nothing while it stays within the same cells.
+        if self.ranges.get(sprite) != self.cell_range(sprite.hitbox):
+            self.remove(sprite)
+            self.add(sprite)
+
+    def query(self, rect):
+        # Returns each live sprite whose hitbox overlaps the rectangle, once.
+        found = set()
+        first_col, first_row, last_col, last_row = self.cell_range(rect)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                found.update(self.cells.get((col, row), ()))
+        return [sprite for sprite in found if sprite.alive() and sprite.hitbox.colliderect(rect)]
+
+def line_area(origin, direction, length, thickness=tile_size):
+    # Rectangle of 'length' cells starting half a cell from 'origin' along a unit direction,
+    # e.g. the cells a flame sweeps in front of the caster.
+    dx, dy = direction
+    start = pygame.math.Vector2(origin) + pygame.math.Vector2(dx, dy) * (tile_size / 2)
+    if dx:
+        rect = pygame.Rect(0, 0, length * tile_size, thickness)
+        if dx > 0:
+            rect.midleft = start
+        else:
+            rect.midright = start
+    else:
+        rect = pygame.Rect(0, 0, thickness, length * tile_size)
+        if dy > 0:
+            rect.midtop = start
+        else:
+            rect.midbottom = start
+    return rect
@@ -0,0 +1,82 @@
+import pygame
+from random import Random
+from settings import *
+from enemy import Enemy
+
+class EnemyPool:
+    def __init__(self, groups, obstacle_sprites, add_exp, entity_ids, line_of_sight=None, prebuild=enemy_pool_size):
+        # Groups every spawned enemy joins, plus what Enemy needs to be constructed.
+        self.groups = groups
+        self.obstacle_sprites = obstacle_sprites
+        self.add_exp = add_exp
+        # Source of stable IDs; every spawn is a new entity, even when the object is reused.
+        self.entity_ids = entity_ids
+        self.line_of_sight = line_of_sight
+
+        # Dead enemies waiting to be reused, per monster type.
+        self.free = {monster_name: [] for monster_name in monster_data}
+        self.alive = 0
+
+        # Builds enemies up front so spawning during combat does not allocate.
+        for monster_name in monster_data:
+            for _ in range(prebuild):
+                self.free[monster_name].append(self.build(monster_name))
+
+    def build(self, monster_name):
+        # Creates an enemy outside of any group, wired to return to this pool on death.
+        enemy = Enemy(monster_name, (0, 0), [], self.obstacle_sprites, self.add_exp, self.line_of_sight)
+        enemy.on_release = self.release
+        return enemy
+
+    def acquire(self, monster_name, pos):
+        # Resets a pooled enemy (building one only if the pool is empty) and adds it to the groups.
+        free = self.free[monster_name]
+        enemy = free.pop() if free else self.build(monster_name)
+        enemy.reset(pos)
+        enemy.entity_id = next(self.entity_ids)
+        enemy.add(*self.groups)
+        self.alive += 1
+        return enemy
+
+    def despawn(self, enemy):
+        # Removes a live enemy without a death (no EXP) and returns it to the pool.
+        enemy.kill()
+        self.release(enemy)
+
+    def release(self, enemy):
+        # Takes back an enemy that has already been removed from its groups.
+        self.alive -= 1
+        self.free[enemy.monster_name].append(enemy)
+
+class WaveSpawner:
+    def __init__(self, pool, spawn_points, seed=None):
+        # Pool to draw enemies from and the map positions waves may spawn at.
+        self.pool = pool
+        self.spawn_points = spawn_points
+        self.random = Random(seed)
+        self.last_wave = pygame.time.get_ticks()
+        self.waves = 0
+
+    def update(self, player):
+        # Spawns a wave every wave_interval milliseconds.
+        current_time = pygame.time.get_ticks()
+        if current_time - self.last_wave >= wave_interval:
+            self.last_wave = current_time
+            self.spawn_wave(player)
+
+    def spawn_wave(self, player):
+        # Re-populates spawn points away from the player, up to the live enemy cap.
+        player_pos = pygame.math.Vector2(player.rect.center)
+        candidates = [pos for pos in self.spawn_points
+                      if player_pos.distance_to(pos) >= wave_min_player_distance]
+        self.random.shuffle(candidates)
+
+        spawned = 0
+        monster_names = list(monster_data)
+        for pos in candidates[:wave_size]:
+            if self.pool.alive >= wave_max_enemies:
+                break
+            self.pool.acquire(self.random.choice(monster_names), pos)
+            spawned += 1
+        self.waves += 1
+        return spawned
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from settings import *
+
+class StartupTracer:
+    def __init__(self):
+        # Every stage is timed from this moment, in microseconds as trace events expect.
+        self.origin = time.perf_counter()
+        # Finished stages as Chrome trace events, and the stages still open (innermost last).
+        self.events = []
+        self.open_stages = []
+        # Files and bytes read outside of any stage still count towards the totals.
+        self.files = 0
+        self.bytes = 0
+        self.finished_at = None
+
+    def now(self):
+        # Microseconds since the tracer was created.
+        return (time.perf_counter() - self.origin) * 1000000
+
+    def begin(self, name):
+        # Opens a stage nested inside the innermost open one.
+        self.open_stages.append({'name': name, 'start': self.now(), 'files': 0, 'bytes': 0})
+
+    def end(self):
+        # Closes the innermost stage and records it as a complete ('X') trace event.
+        stage = self.open_stages.pop()
+        self.events.append({
+            'name': stage['name'],
+            'cat': 'startup',
+            'ph': 'X',
+            'ts': round(stage['start'], 1),
+            'dur': round(self.now() - stage['start'], 1),
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': {'files': stage['files'], 'bytes': stage['bytes'], 'depth': len(self.open_stages)},
+        })
+
+    def stage(self, name):
+        # Context manager timing a block as a stage.
+        return TracedStage(self, name)
+
+    def file_read(self, size):
+        # Counts one file (or bundled image) of the given size against every open stage,
+        # so a stage's counts include those of the stages nested in it.
+        self.files += 1
+        self.bytes += size
+        for stage in self.open_stages:
+            stage['files'] += 1
+            stage['bytes'] += size
+
+    def finish(self):
+        # Closes any stages left open and stops the clock.
+        while self.open_stages:
+            self.end()
+        self.finished_at = self.now()
+
+    def write(self, path=startup_trace_path):
+        # Writes the timeline in the Chrome trace-event format (chrome://tracing, Perfetto).
+        events = sorted(self.events, key=lambda event: (event['ts'], -event['dur']))
+        trace = {
+            'traceEvents': [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': 'True Game startup'}}] + events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'files': self.files, 'bytes': self.bytes},
+        }
+        with open(path, 'w') as trace_file:
+            json.dump(trace, trace_file, indent=1)
+
+    def report(self):
+        # Summarizes each stage as an indented tree, in start order.
+        total = self.finished_at if self.finished_at is not None else self.now()
+        lines = [f'startup: {total / 1000:.1f} ms, {self.files} files, {self.bytes / 1048576:.2f} MB read']
+        for event in sorted(self.events, key=lambda event: (event['ts'], -event['dur'])):
+            args = event['args']
+            lines.append(f"{'  ' * (args['depth'] + 1)}{event['name']}: {event['dur'] / 1000:.1f} ms, "
+                         f"{args['files']} files, {args['bytes'] / 1024:.1f} KB")
+        return lines
+
+class TracedStage:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.tracer.begin(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.end()
+        return False
+
+# The tracer recording the current startup, or None when no startup is being traced.
+active_tracer = None
+
+def trace_stage(name):
+    # Times a block as a startup stage; does nothing once startup is over or when tracing is off.
+    return active_tracer.stage(name) if active_tracer else nullcontext()
+
+def trace_file(size):
+    # Counts a file read during startup.
+    if active_tracer:
+        active_tracer.file_read(size)
+
+def trace_path(path):
+    # Counts a file read during startup by its size on disk.
+    if active_tracer and os.path.exists(path):
+        active_tracer.file_read(os.path.getsize(path))
+
+if __name__ == '__main__':
+    # Traces a full cold start, module imports included, up to the first presented frame:
+    # python startup_trace.py [--output startup_trace.json] [--headless]
+    parser = argparse.ArgumentParser(description='Records where startup time goes as a Chrome trace.')
+    parser.add_argument('--output', default=startup_trace_path)
+    parser.add_argument('--headless', action='store_true', help='use the dummy video and audio drivers')
+    args = parser.parse_args()
+
+    # Runs as __main__, so the tracer is installed on the imported module the game reads it from.
+    import startup_trace
+    startup_trace.active_tracer = startup_trace.StartupTracer()
+    with startup_trace.trace_stage('imports'):
+        from main import Game
+    game = Game(headless=args.headless)
+    with startup_trace.trace_stage('first frame'):
+        game.frame()
+    game.finish_startup_trace(args.output)
+    game.shutdown()
@@ -1,10 +1,33 @@
 from csv import reader
 import os
+import threading
+import weakref
 import pygame
+from settings import *
+from bundle import AssetBundle
+from startup_trace import trace_file, trace_path
+
+# Tracks every live loaded Surface and the asset it came from, for memory reports.
+loaded_surfaces = weakref.WeakKeyDictionary()
+# Transparency class of every live loaded image ('opaque', 'colorkey', 'alpha' or 'empty').
+surface_classes = weakref.WeakKeyDictionary()
+# Loaded images with nothing visible, which the camera skips instead of blitting.
+empty_surfaces = weakref.WeakSet()
+# Collision mask of each image that takes part in combat, built once and dropped with the image.
+surface_masks = weakref.WeakKeyDictionary()
+loaded_surfaces_lock = threading.Lock()
+
+# The memory-mapped asset bundle, opened on first use (False once it is known to be missing).
+asset_bundle = None
+# Bundled images edited on disk since the bundle was built; these are read from disk instead.
+stale_bundle_paths = set()
+# Folders whose images were added or removed on disk since the bundle was built; listed from disk.
+stale_bundle_folders = set()
 
 def import_csv_layout(path):
     # Initializes an empty list to store the grid map data.
     terrain_map = []
+    trace_path(path)
     # Opens the CSV file located at the specified path.
     with open(path) as level_map:
         # Creates a CSV reader object to parse the file using a comma delimiter.
@@ -16,20 +39,186 @@ def import_csv_layout(path):
     # Returns the complete 2D list representing the map layout.
     return terrain_map
 
+def get_asset_bundle():
+    # Opens the prebuilt asset bundle if there is one; images fall back to PNG files otherwise.
+    global asset_bundle
+    if asset_bundle is None:
+        asset_bundle = False
+        if asset_bundle_path and os.path.exists(asset_bundle_path):
+            try:
+                asset_bundle = AssetBundle(asset_bundle_path)
+            except ValueError as error:
+                # An older bundle format; the PNG files are used until it is rebuilt.
+                print(f"{error}; loading PNG files (rebuild with 'python bundle.py')")
+    return asset_bundle
+
 def import_folder(path):
     # Initializes an empty list to store loaded image surfaces.
     surface_list = []
 
-    # Walks through the directory tree at the specified path.
-    # We only care about the list of filenames (img_files) in the current directory.
-    for _,__,img_files in os.walk(path):
-        # Iterates through each file found in the directory.
-        for image in img_files:
-            # Constructs the full file path by joining the directory path and filename.
-            full_path = os.path.join(path, image)
-            # Loads the image from the disk and converts it for faster blitting with alpha transparency.
-            image_surf = pygame.image.load(full_path).convert_alpha()
-            # Adds the loaded surface to the list.
-            surface_list.append(image_surf)
+    # Lists the image files directly inside the folder in sorted order, so frame order is stable.
+    bundle = get_asset_bundle()
+    image_paths = bundle.folder(path) if bundle and os.path.normpath(path) not in stale_bundle_folders else None
+    if image_paths is None:
+        image_paths = []
+        # We only care about the list of filenames (img_files) in the top directory.
+        for _,__,img_files in os.walk(path):
+            image_paths = [os.path.join(path, image) for image in sorted(img_files)]
+            break
+
+    for full_path in image_paths:
+        # Loads the image and converts it for faster blitting with alpha transparency.
+        image_surf = load_image(full_path)
+        # Adds the loaded surface to the list.
+        surface_list.append(image_surf)
     # Returns the list containing all loaded images from the folder.
-    return surface_list
\ No newline at end of file
+    return surface_list
+
+def is_bundled(path):
+    # True when an image is served from the up-to-date asset bundle rather than its PNG.
+    bundle = get_asset_bundle()
+    return bool(bundle) and path in bundle and path not in stale_bundle_paths
+
+def image_source(path):
+    # Returns an image's pixels as stored: a Surface over the bundle's mapped pixels when it is
+    # bundled (nothing is copied until it is converted), otherwise the decoded PNG.
+    bundle = get_asset_bundle()
+    if is_bundled(path):
+        image = bundle.load(path)
+        # Counts the mapped pixels the image is built from.
+        trace_file(image.get_width() * image.get_height() * 4)
+    else:
+        image = pygame.image.load(path)
+        trace_path(path)
+    return image
+
+def load_image(path, alpha=True):
+    # Loads an image (from the bundle when available) and converts it to the display format,
+    # with per-pixel alpha by default.
+    image = image_source(path)
+    if alpha:
+        image, surface_class = optimize_surface(image)
+    else:
+        image, surface_class = image.convert(), 'opaque'
+    register_surface(image, path)
+    with loaded_surfaces_lock:
+        surface_classes[image] = surface_class
+        if surface_class == 'empty':
+            empty_surfaces.add(image)
+    return image
+
+def get_mask(surface):
+    # Returns the cached collision mask of a Surface, building it on first use. Combat images
+    # (frame tables, weapons, grass) are warmed at load so hits never build one mid-frame.
+    mask = surface_masks.get(surface)
+    if mask is None:
+        mask = surface_masks[surface] = pygame.mask.from_surface(surface)
+    return mask
+
+def classify_surface(image):
+    # Sorts an image by the transparency it actually uses:
+    # 'opaque' (no transparent pixels), 'colorkey' (every pixel fully opaque or fully transparent),
+    # 'alpha' (partly transparent pixels) or 'empty' (nothing visible at all).
+    if not image.get_flags() & pygame.SRCALPHA:
+        return 'colorkey' if image.get_colorkey() else 'opaque'
+    pixels = image.get_width() * image.get_height()
+    visible = pygame.mask.from_surface(image, 0).count()
+    solid = pygame.mask.from_surface(image, 254).count()
+    if visible == 0:
+        return 'empty'
+    if solid == pixels:
+        return 'opaque'
+    if solid == visible:
+        return 'colorkey'
+    return 'alpha'
+
+def optimize_surface(image):
+    # Converts an image to the cheapest display format that draws it identically,
+    # returning (surface, class). Opaque images become plain copies, on/off transparency
+    # becomes an RLE colorkey, and only partly transparent images keep per-pixel alpha.
+    image = image.convert_alpha()
+    surface_class = classify_surface(image)
+    rle = pygame.RLEACCEL if surface_rle else 0
+    if surface_class == 'opaque':
+        return image.convert(), surface_class
+    if surface_class == 'colorkey':
+        # Paints the key color where the image is transparent; if the image itself uses the
+        # key color the result would have holes, so it keeps per-pixel alpha instead.
+        keyed = pygame.Surface(image.get_size()).convert()
+        keyed.fill(surface_colorkey)
+        keyed.blit(image, (0, 0))
+        hidden = image.get_width() * image.get_height() - pygame.mask.from_surface(image, 0).count()
+        if pygame.mask.from_threshold(keyed, surface_colorkey, (1, 1, 1, 255)).count() == hidden:
+            keyed.set_colorkey(surface_colorkey, rle)
+            return keyed, surface_class
+        surface_class = 'alpha'
+    if rle:
+        image.set_alpha(255, rle)
+    return image, surface_class
+
+def surface_format_report(surfaces=()):
+    # Lists the pixel format of every live loaded Surface plus any extra (Surface, name) pairs,
+    # such as the images sprites are currently drawn with.
+    with loaded_surfaces_lock:
+        entries = [(surface, asset, surface_classes.get(surface, '-')) for surface, asset in loaded_surfaces.items()]
+    seen = {id(surface) for surface, _, _ in entries}
+    for surface, name in surfaces:
+        if id(surface) not in seen:
+            seen.add(id(surface))
+            entries.append((surface, name + ' (not loaded through support)', '-'))
+
+    lines = []
+    counts = {}
+    for surface, asset, surface_class in sorted(entries, key=lambda entry: entry[1]):
+        flags = surface.get_flags()
+        mode = ('per-pixel alpha' if flags & pygame.SRCALPHA
+                else 'colorkey' if surface.get_colorkey() else 'opaque')
+        if flags & (pygame.RLEACCEL | pygame.RLEACCELOK):
+            mode += ', RLE'
+        counts[mode] = counts.get(mode, 0) + 1
+        lines.append(f'  {asset}: {surface.get_width()}x{surface.get_height()} {surface.get_bitsize()}-bit {mode}, class {surface_class}')
+    summary = '; '.join(f'{mode}: {count}' for mode, count in sorted(counts.items()))
+    return [f'surfaces: {len(entries)} in use ({summary})'] + lines
+
+def reload_image(path):
+    # Re-reads an image from disk and copies its pixels into every live Surface loaded from it,
+    # so sprites, animation frames and caches holding the Surface pick up the change in place.
+    # Returns the number of Surfaces updated, or None if the size or transparency class changed
+    # and they cannot be.
+    stale_bundle_paths.add(path)
+    with loaded_surfaces_lock:
+        surfaces = [surface for surface, asset in loaded_surfaces.items() if asset == path]
+        classes = {surface_classes.get(surface) for surface in surfaces}
+    if not surfaces:
+        return 0
+    image = pygame.image.load(path)
+    if any(surface.get_size() != image.get_size() for surface in surfaces):
+        return None
+    if classes != {classify_surface(image.convert_alpha())}:
+        return None
+    for surface in surfaces:
+        if surface.get_flags() & pygame.SRCALPHA:
+            # Clearing to transparent black and adding gives an exact copy, alpha included.
+            surface.fill((0, 0, 0, 0))
+            surface.blit(image.convert_alpha(surface), (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        else:
+            # Opaque and colorkey images are repainted over their key color.
+            surface.fill(surface.get_colorkey() or (0, 0, 0))
+            surface.blit(image.convert_alpha(), (0, 0))
+        if surface in surface_masks:
+            surface_masks[surface] = pygame.mask.from_surface(surface)
+    return len(surfaces)
+
+def register_surface(surface, asset):
+    # Records a Surface under the asset name it was built from; the entry disappears with the Surface.
+    with loaded_surfaces_lock:
+        loaded_surfaces[surface] = asset
+
+def surface_bytes_by_asset():
+    # Sums the pixel memory of all live registered Surfaces, grouped by asset.
+    with loaded_surfaces_lock:
+        entries = list(loaded_surfaces.items())
+    totals = {}
+    for surface, asset in entries:
+        totals[asset] = totals.get(asset, 0) + surface.get_pitch() * surface.get_height()
+    return totals
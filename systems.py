@@ -0,0 +1,45 @@
+import time
+from settings import *
+
+class SystemPipeline:
+    def __init__(self, systems):
+        # Ordered (name, function) pairs run once per frame.
+        self.systems = systems
+        # Systems can be switched off by name, at startup via disabled_systems or at runtime.
+        self.enabled = {name: name not in disabled_systems for name, _ in systems}
+        # Per-system timing in seconds: last frame, running total and worst frame.
+        self.last = {}
+        self.total = {}
+        self.worst = {}
+        self.frames = 0
+
+    def set_enabled(self, name, enabled):
+        self.enabled[name] = enabled
+
+    def timed(self, name, function, *args):
+        # Runs one system if it is enabled, recording how long it took.
+        if not self.enabled.get(name, True):
+            return
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        self.last[name] = elapsed
+        self.total[name] = self.total.get(name, 0.0) + elapsed
+        self.worst[name] = max(self.worst.get(name, 0.0), elapsed)
+
+    def run(self):
+        # Runs every enabled system in order.
+        self.frames += 1
+        for name, function in self.systems:
+            self.timed(name, function)
+
+    def report(self):
+        # Average and worst cost of each system, in pipeline order.
+        lines = [f'systems: {self.frames} frames']
+        for name in [name for name, _ in self.systems] + [name for name in self.total if name not in dict(self.systems)]:
+            if name in self.total:
+                average = self.total[name] / max(1, self.frames) * 1000
+                lines.append(f'  {name:<10} avg {average:.3f} ms, worst {self.worst[name] * 1000:.3f} ms')
+            else:
+                lines.append(f'  {name:<10} disabled')
+        return lines
@@ -0,0 +1,77 @@
+import weakref
+import pygame
+from pygame._sdl2.video import Window, Renderer, Texture
+from settings import *
+
+class TextureRenderer:
+    def __init__(self, title, size):
+        # Opens its own window with an SDL renderer; the display-module window stays hidden
+        # and only provides the pixel format that images are converted to.
+        self.window = Window(title, size)
+        self.renderer = Renderer(self.window, accelerated=texture_accelerated)
+        self.size = size
+
+        # GPU copy of every Surface drawn so far, uploaded on first use and dropped with the Surface.
+        self.textures = weakref.WeakKeyDictionary()
+
+        # The UI is drawn into a transparent overlay, re-uploaded only when what it shows changes.
+        self.overlay = pygame.Surface(size, pygame.SRCALPHA)
+        self.overlay_texture = Texture(self.renderer, size, streaming=True)
+        self.overlay_texture.blend_mode = 1
+        self.overlay_key = None
+
+        self.background = pygame.Color('black')
+
+    def texture(self, surface):
+        # Returns the texture for a Surface, uploading it the first time it is drawn.
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self.textures[surface] = Texture.from_surface(self.renderer, surface)
+        return texture
+
+    def clear_textures(self):
+        # Forgets every uploaded texture, e.g. after images were changed in place by hot reload.
+        self.textures.clear()
+        self.overlay_key = None
+
+    def draw_overlay(self, ui, hud):
+        # Redraws the UI overlay when the HUD values change or minimap cells were patched
+        # (minimap markers are drawn separately).
+        hud = hud._replace(players=(), enemies=())
+        key = (ui, hud)
+        if key != self.overlay_key:
+            self.overlay_key = key
+            self.overlay.fill((0, 0, 0, 0))
+            ui.display_surface = self.overlay
+            ui.display(hud)
+            self.overlay_texture.update(self.overlay)
+        self.overlay_texture.draw()
+
+    def draw(self, frame):
+        # Draws a frame snapshot with texture copies and presents it.
+        renderer = self.renderer
+        renderer.draw_color = self.background
+        renderer.clear()
+
+        # Floor chunks under the camera.
+        offset = frame.offset
+        view_rect = pygame.Rect((int(offset.x), int(offset.y)), self.size)
+        for chunk, (x, y) in frame.camera.floor.visible_chunks(view_rect):
+            self.texture(chunk).draw(dstrect=(x - offset.x, y - offset.y))
+
+        # Sprites in depth order.
+        texture = self.texture
+        for image, pos, depth in frame.sprites:
+            texture(image).draw(dstrect=pos)
+
+        # UI, then the minimap markers on top of it.
+        self.draw_overlay(frame.ui, frame.hud)
+        if minimap_enabled:
+            for rect, color in frame.ui.minimap.marker_rects(frame.hud.players, frame.hud.enemies):
+                renderer.draw_color = color
+                renderer.fill_rect(rect)
+        renderer.present()
+
+    def close(self):
+        self.textures.clear()
+        self.window.destroy()
@@ -1,5 +1,16 @@
 import pygame
 from settings import *
+from support import load_image
+
+# Shared image of invisible tiles, created on first use.
+invisible_tile_image = None
+
+def invisible_image():
+    global invisible_tile_image
+    if invisible_tile_image is None:
+        invisible_tile_image = pygame.Surface((tile_size, tile_size)).convert()
+        invisible_tile_image.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+    return invisible_tile_image
 
 class Tile(pygame.sprite.Sprite):
     def __init__(self, pos, groups, sprite_type, surface=None):
@@ -15,18 +26,17 @@ class Tile(pygame.sprite.Sprite):
         else:
             # If no surface is provided, handle based on sprite_type.
             if sprite_type == 'invisible':
-                # Create a transparent surface for invisible collision blocks.
-                self.image = pygame.Surface((tile_size, tile_size), flags=pygame.SRCALPHA)
-                self.image.fill((0, 0, 0, 0))
+                # Invisible collision blocks are never drawn, so they share one empty image.
+                self.image = invisible_image()
             else:
                 # Default logic for other types (like obstacles).
                 img_path = 'images/rock.png'
                 try:
                     # Attempt to load the rock image.
-                    self.image = pygame.image.load(img_path).convert_alpha()
+                    self.image = load_image(img_path)
                 except Exception:
                     # Fallback to a magenta square if the image fails to load.
-                    self.image = pygame.Surface((tile_size, tile_size))
+                    self.image = pygame.Surface((tile_size, tile_size)).convert()
                     self.image.fill((255, 0, 255))
         
         # Creates a rectangle representing the grid cell this tile occupies.
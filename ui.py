@@ -1,33 +1,43 @@
 import pygame
 from settings import *
+from support import load_image
+from minimap import Minimap
+from startup_trace import trace_stage, trace_path
 
 class UI:
     def __init__(self):
         # Gets a reference to the main display surface.
         self.display_surface = pygame.display.get_surface()
-        # Creates a font object for general UI text.
-        self.font = pygame.font.Font(ui_font, ui_font_size)
-        # Creates a larger font object specifically for the victory message.
-        self.victory_font = pygame.font.Font(ui_font, 50)
+        with trace_stage('UI fonts'):
+            # Creates a font object for general UI text.
+            self.font = pygame.font.Font(ui_font, ui_font_size)
+            trace_path(ui_font)
+            # Creates a larger font object specifically for the victory message.
+            self.victory_font = pygame.font.Font(ui_font, 50)
+            trace_path(ui_font)
 
         # Defines the rectangle for the health bar background.
         self.health_bar_rect = pygame.Rect(10, 10, health_bar_width, bar_height)
         # Defines the rectangle for the magic/energy bar background.
         self.magic_bar_rect = pygame.Rect(10, 34, magic_bar_width, bar_height)
 
-        # Pre-loads all weapon images to be displayed in the UI overlay.
-        self.weapon_graphics = []
-        for weapon in weapons_data.values():
-            path = weapon['graphic']
-            weapon = pygame.image.load(path).convert_alpha()
-            self.weapon_graphics.append(weapon)
-        
-        # Pre-loads all magic spell images to be displayed in the UI overlay.
-        self.magic_graphics = []
-        for magic in magic_data.values():
-            path = magic['graphic']
-            magic_surf = pygame.image.load(path).convert_alpha()
-            self.magic_graphics.append(magic_surf)
+        with trace_stage('UI icons'):
+            # Pre-loads all weapon images to be displayed in the UI overlay.
+            self.weapon_graphics = []
+            for weapon in weapons_data.values():
+                path = weapon['graphic']
+                weapon = load_image(path)
+                self.weapon_graphics.append(weapon)
+            
+            # Pre-loads all magic spell images to be displayed in the UI overlay.
+            self.magic_graphics = []
+            for magic in magic_data.values():
+                path = magic['graphic']
+                magic_surf = load_image(path)
+                self.magic_graphics.append(magic_surf)
+
+        # Low-resolution map overlay, patched as tiles change instead of redrawn.
+        self.minimap = Minimap()
 
 
     def show_bar(self, current, max_amount, bg_rect, color):
@@ -128,12 +138,19 @@ class UI:
         # Blits the victory text onto the screen.
         self.display_surface.blit(text_surf, text_rect)
 
-    def display(self, player):
-        # Main method called every frame to draw all UI elements.
-        self.show_bar(player.health, player.stats['health'], self.health_bar_rect, health_color)
-        self.show_bar(player.energy, player.stats['energy'], self.magic_bar_rect, energy_color)
+    def display(self, hud):
+        # Main method called every frame to draw all UI elements from a HudState snapshot.
+        self.show_bar(hud.health, hud.max_health, self.health_bar_rect, health_color)
+        self.show_bar(hud.energy, hud.max_energy, self.magic_bar_rect, energy_color)
 
-        self.show_exp(player.exp)
+        self.show_exp(hud.exp)
         
-        self.weapon_overlay(player.weapon_index)
-        self.magic_overlay(player.magic_index)
\ No newline at end of file
+        self.weapon_overlay(hud.weapon_index)
+        self.magic_overlay(hud.magic_index)
+
+        if minimap_enabled:
+            self.minimap.draw(self.display_surface, hud.players, hud.enemies, hud.minimap_changes)
+
+        # Shows the victory message once every enemy is defeated.
+        if hud.victory:
+            self.display_victory_message()
\ No newline at end of file
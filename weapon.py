@@ -1,19 +1,41 @@
 import pygame
+from settings import *
+from support import load_image, get_mask
+from animation import direction_names
 
 class Weapon(pygame.sprite.Sprite):
+    # Weapon images keyed by path, loaded and converted once instead of on every swing.
+    image_cache = {}
+
+    @staticmethod
+    def image(weapon, direction):
+        # Returns the image of a weapon facing a direction, loading it and its collision mask once.
+        full_path = f'graphics/weapons/{weapon}/{direction}.png'
+        if full_path not in Weapon.image_cache:
+            Weapon.image_cache[full_path] = load_image(full_path)
+            get_mask(Weapon.image_cache[full_path])
+        return Weapon.image_cache[full_path]
+
+    @staticmethod
+    def load_images():
+        # Loads every weapon in every direction up front, so no swing loads an image or builds a mask.
+        for weapon in weapons_data:
+            for direction in direction_names:
+                Weapon.image(weapon, direction)
+
     def __init__(self, player, groups):
         # Initializes the weapon sprite and adds it to the relevant groups (visible and attack sprites).
         super().__init__(groups)
         # Identifies this sprite as a weapon for collision logic.
         self.sprite_type = 'weapon'
+        # The player wielding this weapon, credited with any damage it deals.
+        self.owner = player
         
         # Determines the direction the player is facing to orient the weapon correctly.
-        direction = player.status.split('_')[0]
+        direction = direction_names[player.facing]
 
-        # Constructs the file path for the weapon image based on the player's current weapon and direction.
-        full_path = f'graphics/weapons/{player.weapon}/{direction}.png'
-        # Loads the weapon image.
-        self.image = pygame.image.load(full_path).convert_alpha()
+        # Looks up the image for the player's current weapon and direction (loaded by load_images).
+        self.image = Weapon.image(player.weapon, direction)
         
         # Positions the weapon relative to the player based on direction.
         if direction == 'right':